@@ -135,14 +135,18 @@ def run_backtest_with_rebalancing(prices: pd.DataFrame, weights: dict, initial_c
         "rebalance_dates": rebalance_dates,
     }
 
-def run_backtest(prices: pd.DataFrame, weights: dict, benchmark_data: pd.Series = None, initial_capital: float = 10000.0, risk_free_rate: float = 0.045, annualization_factor: int = 252, mar: float = None, rebalance_freq: str = "never"):
+def run_backtest(prices: pd.DataFrame, weights: dict, benchmark_data: pd.Series = None, initial_capital: float = 10000.0, risk_free_rate: float = 0.045, annualization_factor: int = 252, mar: float = None, rebalance_freq: str = "never", asset_returns: pd.DataFrame = None):
     """
     Run a historical backtest of the optimized portfolio.
+    
+    asset_returns may be passed when the caller already has
+    prices.pct_change().dropna(), to skip recomputing it.
     """
     tickers = prices.columns.tolist()
     weight_vector = np.array([weights.get(t, 0) for t in tickers])
     
-    asset_returns = prices.pct_change().dropna()
+    if asset_returns is None:
+        asset_returns = prices.pct_change().dropna()
     
     portfolio_returns = asset_returns.dot(weight_vector)
     
@@ -0,0 +1,363 @@
+"""
+Persistent on-disk cache for market data fetched from Yahoo Finance.
+
+DataFrames and Series are stored as zstd-compressed (level 3) Parquet, everything else
+(info dicts, scalar rates) as JSON. Each entry has a small sidecar file that
+records its kind and expiry, so entries with different TTLs can share one
+directory and be reused across worker processes and restarts.
+
+When PORTOPT_REDIS_URL is set (and redis-py is installed) the same entries
+are kept in Redis instead, so every instance behind the load balancer shares
+one cache rather than each warming its own disk.
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import functools
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+CACHE_DIR = os.environ.get("PORTOPT_CACHE_DIR", os.path.expanduser("~/.portopt_cache"))
+REDIS_URL = os.environ.get("PORTOPT_REDIS_URL")
+
+logger = logging.getLogger(__name__)
+
+TTL_HISTORICAL = 24 * 60 * 60
+TTL_INFO = 60 * 60
+TTL_RISK_FREE = 24 * 60 * 60
+TTL_CHART = 15 * 60
+TTL_CHART_INTRADAY = 60
+TTL_NEGATIVE = 5 * 60
+TTL_STOCK_INFO = 15 * 60
+TTL_OPTIMIZE = 15 * 60
+
+
+def make_key(fn: str, **params) -> str:
+    """Build a stable cache key from a function name and its request parameters."""
+    payload = json.dumps({"fn": fn, **params}, sort_keys=True, default=str)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def _is_empty(value) -> bool:
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.empty
+    return value == {} or value == []
+
+
+def _to_frame(value, meta: dict) -> pd.DataFrame:
+    """Frame to write as Parquet for a DataFrame or Series, recording how to restore it in meta."""
+    if isinstance(value, pd.Series):
+        meta["kind"] = "series"
+        meta["name"] = value.name if isinstance(value.name, str) else None
+        return value.to_frame(name="value")
+    meta["kind"] = "frame"
+    if isinstance(value.columns, pd.DatetimeIndex):
+        meta["datetime_columns"] = True
+        value = value.copy()
+        value.columns = value.columns.astype(str)
+    return value
+
+
+def _from_frame(frame: pd.DataFrame, meta: dict):
+    if meta.get("datetime_columns"):
+        frame.columns = pd.to_datetime(frame.columns)
+    if meta["kind"] == "series":
+        series = frame.iloc[:, 0]
+        series.name = meta.get("name")
+        return series
+    return frame
+
+
+class FileCache:
+    """
+    Key/value store on the local filesystem with a per-entry TTL.
+
+    Failures to read or write are logged and treated as cache misses so a
+    broken cache directory never breaks a request.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def _atomic_write(self, path: str, write):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key, "meta.json")) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("expires", 0) < time.time():
+            return None
+
+        try:
+            kind = meta["kind"]
+            if kind == "json":
+                with open(self._path(key, "json")) as f:
+                    return json.load(f)
+
+            return _from_frame(pd.read_parquet(self._path(key, "parquet")), meta)
+        except Exception as e:
+            logger.warning("Could not read cache entry %s: %s", key, e)
+            return None
+
+    def get_many(self, keys: list) -> list:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value, ttl: float) -> None:
+        meta = {"expires": time.time() + ttl}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            if isinstance(value, (pd.DataFrame, pd.Series)):
+                frame = _to_frame(value, meta)
+                self._atomic_write(self._path(key, "parquet"), lambda p: frame.to_parquet(p, compression="zstd", compression_level=3))
+            else:
+                meta["kind"] = "json"
+
+                def write_json(p):
+                    with open(p, "w") as f:
+                        json.dump(value, f, default=str)
+                self._atomic_write(self._path(key, "json"), write_json)
+
+            def write_meta(p):
+                with open(p, "w") as f:
+                    json.dump(meta, f)
+            self._atomic_write(self._path(key, "meta.json"), write_meta)
+        except Exception as e:
+            logger.warning("Could not write cache entry %s: %s", key, e)
+
+
+class RedisCache:
+    """
+    Same interface and encoding as FileCache, backed by Redis. Each entry is
+    a hash holding the sidecar metadata and the payload, and Redis expires it
+    itself. Connection errors are treated as cache misses.
+    """
+
+    def __init__(self, url: str, prefix: str = "portopt:"):
+        self.client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.prefix = prefix
+
+    def _decode(self, key: str, entry: dict):
+        if not entry:
+            return None
+        try:
+            meta = json.loads(entry[b"meta"])
+            if meta["kind"] == "json":
+                return json.loads(entry[b"data"])
+            return _from_frame(pd.read_parquet(io.BytesIO(entry[b"data"])), meta)
+        except Exception as e:
+            logger.warning("Could not read cache entry %s: %s", key, e)
+            return None
+
+    def get(self, key: str):
+        try:
+            entry = self.client.hgetall(self.prefix + key)
+        except Exception as e:
+            logger.warning("Could not read cache entry %s: %s", key, e)
+            return None
+        return self._decode(key, entry)
+
+    def get_many(self, keys: list) -> list:
+        """Look up several entries in one round-trip."""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(self.prefix + key)
+            entries = pipe.execute()
+        except Exception as e:
+            logger.warning("Could not read cache entries: %s", e)
+            return [None] * len(keys)
+        return [self._decode(key, entry) for key, entry in zip(keys, entries)]
+
+    def set(self, key: str, value, ttl: float) -> None:
+        meta = {}
+        try:
+            if isinstance(value, (pd.DataFrame, pd.Series)):
+                buf = io.BytesIO()
+                _to_frame(value, meta).to_parquet(buf, compression="zstd", compression_level=3)
+                data = buf.getvalue()
+            else:
+                meta["kind"] = "json"
+                data = json.dumps(value, default=str)
+
+            name = self.prefix + key
+            pipe = self.client.pipeline()
+            pipe.hset(name, mapping={"meta": json.dumps(meta), "data": data})
+            pipe.expire(name, max(int(ttl), 1))
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Could not write cache entry %s: %s", key, e)
+
+
+if REDIS_URL and redis is not None:
+    file_cache = RedisCache(REDIS_URL)
+else:
+    file_cache = FileCache()
+
+
+class SeriesStore:
+    """
+    Per-symbol price history persisted as Parquet, with a sidecar recording
+    the [start, end) window it covers. Unlike FileCache entries these never
+    expire; callers extend them with whatever dates they are missing.
+    """
+
+    def __init__(self, directory: str = os.path.join(CACHE_DIR, "prices")):
+        self.directory = directory
+
+    def _path(self, symbol: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{symbol}.{suffix}")
+
+    def load(self, symbol: str) -> tuple:
+        """Return (series, (start, end)) or (None, None) when nothing is stored."""
+        try:
+            with open(self._path(symbol, "json")) as f:
+                meta = json.load(f)
+            series = pd.read_parquet(self._path(symbol, "parquet"), columns=["close"])["close"]
+            return series, (pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"]))
+        except (OSError, ValueError, KeyError):
+            return None, None
+        except Exception as e:
+            logger.warning("Could not read stored prices for %s: %s", symbol, e)
+            return None, None
+
+    def save(self, symbol: str, series: pd.Series, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            frame = series.rename("close").to_frame()
+            tmp_path = f"{self._path(symbol, 'parquet')}.{os.getpid()}.tmp"
+            frame.to_parquet(tmp_path, compression="zstd", compression_level=3)
+            os.replace(tmp_path, self._path(symbol, "parquet"))
+
+            # Written after the data so a concurrent reader never sees a
+            # window wider than the bars on disk.
+            tmp_path = f"{self._path(symbol, 'json')}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"start": start.isoformat(), "end": end.isoformat()}, f)
+            os.replace(tmp_path, self._path(symbol, "json"))
+        except Exception as e:
+            logger.warning("Could not store prices for %s: %s", symbol, e)
+
+
+price_store = SeriesStore()
+
+
+def cached_call(fn: str, ttl: float, fetch, **params):
+    """
+    Return the cached result for (fn, params), calling fetch() on a miss.
+
+    Empty results are stored with a short TTL so repeated requests for an
+    unknown symbol do not hammer Yahoo; None is never cached.
+    """
+    key = make_key(fn, **params)
+    value = file_cache.get(key)
+    if value is not None:
+        return value
+
+    value = fetch()
+    if value is not None:
+        file_cache.set(key, value, TTL_NEGATIVE if _is_empty(value) else ttl)
+    return value
+
+
+def cached_values(fn: str, params_list: list) -> list:
+    """
+    Cached results for several parameter sets of fn in one lookup (a single
+    round-trip with Redis), None where there is no live entry.
+    """
+    return file_cache.get_many([make_key(fn, **params) for params in params_list])
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(_freeze(v) for v in value)
+        if not isinstance(value, tuple) and all(isinstance(v, str) for v in items):
+            items = tuple(sorted(items))
+        return items
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class TTLStore:
+    """
+    Thread-safe in-process LRU whose entries expire ttl seconds after they
+    were stored, on the monotonic clock.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] > now:
+                self._entries.move_to_end(key)
+                return hit[1]
+        return None
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def ttl_cache(ttl: float, maxsize: int = 128):
+    """
+    Memoize a function in process for ttl seconds on the monotonic clock.
+
+    Sits in front of the disk cache so hot requests skip the Parquet read as
+    well. Lists and sets of symbols are keyed order-independently, and empty
+    results are not memoized.
+    """
+    def decorator(fn):
+        store = TTLStore(ttl, maxsize)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (_freeze(args), _freeze(kwargs))
+            value = store.get(key)
+            if value is not None:
+                return value
+
+            value = fn(*args, **kwargs)
+            if value is not None and not _is_empty(value):
+                store.set(key, value)
+            return value
+
+        wrapper.cache_clear = store.clear
+        return wrapper
+    return decorator
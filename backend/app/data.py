@@ -1,61 +1,304 @@
+import asyncio
+import logging
+import threading
+import time
 import yfinance as yf
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+import orjson
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dtime
+from typing import NamedTuple, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from collections import namedtuple
 
-def fetch_historical_data(tickers: list[str], start_date: str, end_date: str, interval: str = "1d") -> pd.DataFrame:
+from cache import (
+    cached_call, cached_values, ttl_cache, TTLStore, price_store, TTL_HISTORICAL, TTL_INFO, TTL_RISK_FREE, TTL_CHART, TTL_CHART_INTRADAY, TTL_STOCK_INFO
+)
+from rate_limiter import yahoo_bucket
+
+logger = logging.getLogger(__name__)
+
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+INTRADAY_INTERVALS = frozenset({'1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h'})
+
+_EARNINGS_FIELDS = {"earnings", "earningsHistory", "nextEarningsDate"}
+
+# Result keys that only the full .info payload can supply; price, 52-week
+# range, market cap, currency and volume come from the lighter fast_info.
+_INFO_FIELDS = {
+    "trailingPE", "forwardPE", "dividendRate", "dividendYield", "shortName", "longName",
+    "sector", "industry", "exDividendDate", "lastDividendValue", "trailingEps",
+    "averageVolume", "beta", "ipoDate"
+}
+
+YF_BATCH_SIZE = 20
+
+OVERVIEW_TIMEOUT = 10
+# Yahoo requests one uncached overview symbol costs (info, quote, earnings,
+# financials, returns history, ratings, latest price).
+OVERVIEW_REQUESTS_PER_SYMBOL = 8
+
+PRICE_STORAGE_DTYPE = np.float32
+
+TICKER_HANDLE_TTL = 60
+
+# Shared pools. Leaf Yahoo requests run on _YF_POOL; per-symbol fan-out
+# (whose tasks themselves submit leaf requests) runs on _SYMBOL_POOL, so a
+# saturated pool can never end up waiting on work queued behind itself.
+_YF_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="yf")
+_SYMBOL_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="yf-symbol")
+
+_YF_DOWNLOAD_LOCK = threading.Lock()
+
+def _yahoo(fn, *args, **kwargs):
+    """Call fn once a token is available from the outbound Yahoo rate limiter."""
+    yahoo_bucket.acquire()
+    return fn(*args, **kwargs)
+
+def yf_download(*args, **kwargs) -> pd.DataFrame:
+    # yf.download collects its results in module-level state, so concurrent
+    # calls from worker threads can mix up each other's frames.
+    yahoo_bucket.acquire()
+    with _YF_DOWNLOAD_LOCK:
+        return yf.download(*args, **kwargs)
+
+_Q_TABLE = [None] + [(4, -1)] * 3 + [(1, 0)] * 3 + [(2, 0)] * 3 + [(3, 0)] * 3
+
+@lru_cache(maxsize=512)
+def _ticker_handle(symbol: str, bucket: int) -> yf.Ticker:
+    return yf.Ticker(symbol)
+
+def _ticker(symbol: str) -> yf.Ticker:
+    """
+    Shared yf.Ticker per symbol. A Ticker memoizes its info and fast_info for
+    its whole lifetime, so handles are replaced every TICKER_HANDLE_TTL seconds.
+    """
+    return _ticker_handle(symbol, int(time.time() // TICKER_HANDLE_TTL))
+
+def fetch_historical_data(tickers: list[str], start_date: str, end_date: str, interval: str = "1d", dtype=np.float64) -> pd.DataFrame:
+    """
+    Close prices for tickers, memoized in process and on disk. The symbols
+    are canonicalised to a sorted tuple here, so the key (and the column
+    order) does not depend on the order or container they arrive in.
+    """
+    return _fetch_historical_data_memo(tuple(sorted(tickers)), start_date, end_date, interval, dtype)
+
+@ttl_cache(ttl=TTL_HISTORICAL, maxsize=32)
+def _fetch_historical_data_memo(tickers: tuple, start_date: str, end_date: str, interval: str, dtype) -> pd.DataFrame:
+    # Prices are stored as float32, which halves the cache footprint and is
+    # well within quote precision; callers choose the dtype they compute in.
+    data = cached_call(
+        "historical", TTL_HISTORICAL,
+        lambda: _fetch_historical_data(list(tickers), start_date, end_date, interval).astype(PRICE_STORAGE_DTYPE, copy=False),
+        tickers=list(tickers), start=start_date, end=end_date, interval=interval, dtype=np.dtype(PRICE_STORAGE_DTYPE).name
+    )
+    return data.astype(dtype, copy=False)
+
+def _ffill_2d(vals: np.ndarray) -> tuple:
+    """
+    Forward-fill NaNs down each column of a 2-D float array. Also returns
+    the number of NaNs in the input, counted from the same mask.
+    """
+    missing = np.isnan(vals)
+    # int32 row positions halve the scratch array against the default int64.
+    idx_dtype = np.int32 if vals.shape[0] < 2**31 else np.int64
+    row_idx = np.where(missing, 0, np.arange(vals.shape[0], dtype=idx_dtype)[:, None])
+    np.maximum.accumulate(row_idx, axis=0, out=row_idx)
+    return vals[row_idx, np.arange(vals.shape[1])], int(missing.sum())
+
+def ffill_drop_leading(data: pd.DataFrame) -> tuple:
+    """
+    Equivalent to data.ffill().dropna(): after a forward fill only the rows
+    before some column's first quote can still hold NaN, so slice them off.
+    Returns the cleaned frame and the number of NaNs in the input. Float
+    input keeps its dtype, so float32 prices stay float32.
+    """
+    vals = data.to_numpy()
+    if vals.dtype.kind != 'f':
+        vals = vals.astype(np.float64)
+    filled, n_missing = _ffill_2d(vals)
+    complete = ~np.isnan(filled).any(axis=1)
+    first = int(np.argmax(complete)) if complete.any() else len(filled)
+    return pd.DataFrame(filled[first:], index=data.index[first:], columns=data.columns), n_missing
+
+async def fetch_historical_data_async(tickers: list[str], start_date: str, end_date: str, interval: str = "1d", dtype=np.float64) -> pd.DataFrame:
+    """
+    fetch_historical_data for async handlers. The download and cleaning run
+    in a worker thread so the event loop keeps serving other requests.
+    """
+    return await asyncio.to_thread(fetch_historical_data, tickers, start_date, end_date, interval, dtype)
+
+def _fetch_historical_data(tickers: list[str], start_date: str, end_date: str, interval: str) -> pd.DataFrame:
     try:
-        raw_data = yf.download(tickers, start=start_date, end=end_date, interval=interval, progress=False)
+        data = fetch_historical_data_batch(tickers, start_date, end_date, interval)
         
-        if raw_data.empty:
+        if data.empty:
             raise ValueError("No data found for the provided tickers and date range.")
-
-        if 'Adj Close' in raw_data.columns:
-            data = raw_data['Adj Close']
-        elif 'Close' in raw_data.columns:
-            data = raw_data['Close']
-        else:
-            raise ValueError("Could not find 'Adj Close' or 'Close' price data.")
         
-        if isinstance(data, pd.Series):
-            data = data.to_frame()
-            if len(tickers) == 1:
-                data.columns = tickers
-            
-        data.index = pd.to_datetime(data.index)
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.to_datetime(data.index)
         if data.index.tz is not None:
             data.index = data.index.tz_localize(None)
             
-        initial_missing = data.isna().sum().sum()
-        
-        data = data.ffill()
-        data = data.dropna()
+        data, initial_missing = ffill_drop_leading(data)
         
         if initial_missing > 0:
             missing_pct = initial_missing / (len(data) * len(data.columns)) * 100
-            print(f"INFO: Filled {initial_missing} missing values ({missing_pct:.2f}%) using forward/backward fill")
+            logger.info("Filled %s missing values (%.2f%%) using forward/backward fill", initial_missing, missing_pct)
         
         if data.empty:
             raise ValueError("No data available after cleaning.")
         
         validation = validate_price_data(data)
-        if not validation["valid"]:
-            raise ValueError(f"Data validation failed: {validation['warnings']}")
-        
-        if validation["warnings"]:
-            print("\n=== DATA QUALITY WARNINGS ===")
-            for warning in validation["warnings"]:
-                print(f"  ⚠️  {warning}")
-            print("=== END WARNINGS ===\n")
-            
+        if not validation.valid:
+            raise ValueError(f"Data validation failed: {validation.warnings}")
+        
+        if validation.warnings:
+            logger.warning("Data quality warnings for %s: %s", tickers, validation.warnings)
+        
         return data
     except Exception as e:
-        print(f"Error: yfinance fetch failed for {tickers}: {e}")
+        logger.error("yfinance fetch failed for %s: %s", tickers, e)
         raise ValueError(f"Failed to fetch market data: {str(e)}")
 
+def fetch_historical_data_batch(tickers: list[str], start_date: str, end_date: str, interval: str = "1d") -> pd.DataFrame:
+    """
+    Raw close prices for tickers. Daily bars are served from the per-symbol
+    price store and only the missing dates are downloaded; other intervals
+    are fetched in full.
+    """
+    if interval == "1d":
+        return _fetch_daily_closes_incremental(tickers, start_date, end_date)
+    return _download_closes(tickers, start_date, end_date, interval)
+
+def _fetch_daily_closes_incremental(tickers: list[str], start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Only the head before the first stored bar and the tail after the last
+    stored bar are downloaded, each overlapping the stored history by one bar.
+    Today's bar is still forming, so it is returned but never persisted.
+    """
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    today = pd.Timestamp(date.today())
+
+    stored = {}
+    coverage = {}
+    windows = {}
+    for sym in sorted({t.upper() for t in tickers}):
+        series, window = price_store.load(sym)
+        if series is None or series.empty:
+            stored[sym] = None
+            windows.setdefault((start, end), []).append(sym)
+            continue
+
+        stored[sym], coverage[sym] = series, window
+        if start < window[0]:
+            windows.setdefault((start, series.index[0] + pd.Timedelta(days=1)), []).append(sym)
+        if window[1] < end:
+            windows.setdefault((series.index[-1], end), []).append(sym)
+
+    # Coverage only grows over windows that actually returned bars, so an
+    # empty download (Yahoo's usual way of failing transiently) is retried
+    # next time instead of being recorded as covered. A head that returned
+    # bars covers back to the requested start, since nothing before its first
+    # bar (a weekend, a holiday, the IPO) will ever be quoted; a tail only
+    # covers up to the last bar received.
+    received = {}
+    for (w_start, w_end), group in windows.items():
+        fetched = _download_closes(group, w_start.strftime("%Y-%m-%d"), w_end.strftime("%Y-%m-%d"), "1d")
+        for sym in group:
+            new = fetched[sym].dropna().astype(np.float64) if sym in fetched.columns else pd.Series(dtype=np.float64)
+            if new.empty:
+                continue
+            old = stored[sym]
+            head_start = w_start if old is None or w_start < old.index[0] else new.index[0]
+            first, last = received.get(sym, (head_start, new.index[-1]))
+            received[sym] = (min(first, head_start), max(last, new.index[-1]))
+            if old is None:
+                stored[sym] = new
+            elif w_start < old.index[0]:
+                stored[sym] = _splice_closes(old, new, at=old.index[0], head=True)
+            else:
+                stored[sym] = _splice_closes(old, new, at=w_start, head=False)
+
+    for sym, (first, last) in received.items():
+        last = min(last + pd.Timedelta(days=1), today)
+        if sym in coverage:
+            first, last = min(first, coverage[sym][0]), max(last, coverage[sym][1])
+        series = stored[sym]
+        price_store.save(sym, series[series.index < today], first, last)
+
+    columns = {
+        sym: series[(series.index >= start) & (series.index < end)]
+        for sym, series in stored.items() if series is not None and not series.empty
+    }
+    if not columns:
+        return pd.DataFrame()
+    return pd.DataFrame(columns, dtype=PRICE_STORAGE_DTYPE)
+
+def _splice_closes(stored: pd.Series, fresh: pd.Series, at: pd.Timestamp, head: bool) -> pd.Series:
+    """
+    Join freshly downloaded closes onto stored ones, overlapping on the bar at
+    `at`; `head` says whether the fresh piece precedes the stored history.
+    Adjusted closes of every earlier bar move after a dividend or split, so
+    the stored history is first rescaled to the fresh basis via that bar.
+    """
+    if fresh.empty:
+        return stored
+    if at in stored.index and at in fresh.index:
+        ratio = fresh.loc[at] / stored.loc[at]
+        if np.isfinite(ratio) and ratio > 0 and not np.isclose(ratio, 1.0, rtol=1e-9, atol=0.0):
+            stored = stored * ratio
+    if head:
+        return pd.concat([fresh[fresh.index < at], stored[stored.index >= at]])
+    return pd.concat([stored[stored.index < at], fresh[fresh.index >= at]])
+
+def _download_closes(tickers: list[str], start_date: str, end_date: str, interval: str) -> pd.DataFrame:
+    """
+    Download raw close prices in shards of YF_BATCH_SIZE symbols, one Yahoo
+    request per shard, and join the shards column-wise.
+    """
+    frames = []
+    for i in range(0, len(tickers), YF_BATCH_SIZE):
+        group = tickers[i:i + YF_BATCH_SIZE]
+        # A list of symbols with multi_level_index keeps a (Price, Ticker)
+        # header even for one symbol, so the close level is always a frame.
+        # auto_adjust folds dividends and splits into Close, so Yahoo never
+        # sends a separate Adj Close column.
+        raw_data = yf_download(
+            group, start=start_date, end=end_date, interval=interval, progress=False,
+            auto_adjust=True, group_by='column', threads=True, multi_level_index=True
+        )
+        
+        if raw_data.empty:
+            continue
+
+        if 'Close' not in raw_data.columns:
+            raise ValueError("Could not find 'Close' price data.")
+        # Adjusted closes carry about six significant digits, which float32
+        # holds exactly for prices up to ~1e6; casting here halves the memory
+        # every later cleaning step has to move.
+        frames.append(raw_data['Close'].astype(PRICE_STORAGE_DTYPE))
+
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+
+@ttl_cache(ttl=TTL_HISTORICAL, maxsize=32)
 def fetch_benchmark_data(start_date: str, end_date: str, benchmark_ticker: str = "SPY") -> pd.Series:
+    return cached_call(
+        "benchmark", TTL_HISTORICAL,
+        lambda: _fetch_benchmark_data(start_date, end_date, benchmark_ticker),
+        tickers=[benchmark_ticker], start=start_date, end=end_date, interval="1d"
+    )
+
+def _fetch_benchmark_data(start_date: str, end_date: str, benchmark_ticker: str) -> pd.Series:
     try:
-        raw_data = yf.download(benchmark_ticker, start=start_date, end=end_date, progress=False)
+        # Ticker.history keeps no module-level state, unlike yf.download, so
+        # it can run alongside a portfolio download without taking the lock.
+        raw_data = _yahoo(_ticker(benchmark_ticker).history, start=start_date, end=end_date)
         
         if 'Adj Close' in raw_data.columns:
             data = raw_data['Adj Close']
@@ -64,133 +307,347 @@ def fetch_benchmark_data(start_date: str, end_date: str, benchmark_ticker: str =
         else:
             return pd.Series()
         
-        if isinstance(data, pd.DataFrame):
-            data = data.iloc[:, 0]
-            
-        data.index = pd.to_datetime(data.index)
+        data = data.rename(benchmark_ticker)
+        if not isinstance(data.index, pd.DatetimeIndex):
+            data.index = pd.to_datetime(data.index)
         if data.index.tz is not None:
             data.index = data.index.tz_localize(None)
         
-        data = data.ffill().dropna()
-        
-        return data
+        # Only NaNs before the first quote survive a forward fill, so slice
+        # those off first instead of filling and then running dropna.
+        first_valid = data.first_valid_index()
+        if first_valid is None:
+            return pd.Series()
+        return data.loc[first_valid:].ffill()
     except Exception as e:
-        print(f"Warning: Failed to fetch benchmark data: {e}")
+        logger.warning("Failed to fetch benchmark data: %s", e)
         return pd.Series()
 
-def validate_price_data(prices: pd.DataFrame, min_days: int = 60) -> dict:
+async def fetch_benchmark_data_async(start_date: str, end_date: str, benchmark_ticker: str = "SPY") -> pd.Series:
+    return await asyncio.to_thread(fetch_benchmark_data, start_date, end_date, benchmark_ticker)
+
+class ValidationStats(NamedTuple):
+    days: int
+    years: Optional[float] = None
+    actual_trading_days_per_year: Optional[float] = None
+
+class ValidationResult(NamedTuple):
+    valid: bool
+    warnings: list
+    stats: ValidationStats
+
+def validate_price_data(prices: pd.DataFrame, min_days: int = 60, scan_window: Optional[int] = None) -> ValidationResult:
+    """
+    Extreme-move detection scans the whole history in one vectorised pass by
+    default; pass scan_window to restrict it to the last scan_window returns.
+    Missing data always uses the full frame.
+    """
     warnings = []
     
     num_days = len(prices)
     if num_days < min_days:
-        return {
-            "valid": False,
-            "warnings": [f"Insufficient data: {num_days} days (minimum: {min_days} required for stable covariance matrix)"],
-            "stats": {"days": num_days}
-        }
-    
-    returns = prices.pct_change().dropna()
+        return ValidationResult(
+            valid=False,
+            warnings=[f"Insufficient data: {num_days} days (minimum: {min_days} required for stable covariance matrix)"],
+            stats=ValidationStats(days=num_days)
+        )
     
-    for col in returns.columns:
-        extreme_moves = returns[col][abs(returns[col]) > 0.5]
-        if len(extreme_moves) > 0:
-            warnings.append(f"{col}: {len(extreme_moves)} extreme moves (>50%) detected on {extreme_moves.index.tolist()}")
-    
-    missing_pct = prices.isna().sum() / len(prices)
-    for col in prices.columns:
-        if missing_pct[col] > 0.1:  
-            warnings.append(f"{col}: {missing_pct[col]:.1%} missing data")
+    vals = prices.to_numpy(dtype=np.float64)
+    scan_start = max(num_days - scan_window - 1, 0) if scan_window else 0
+    scan = vals[scan_start:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rets = scan[1:] / scan[:-1] - 1.0
+    extreme_mask = np.abs(rets) > 0.5
+    missing = np.isnan(vals)
+
+    # Clean frames (the common case after ffill_drop_leading) stop at the
+    # two any() reductions and skip the per-column bookkeeping.
+    if extreme_mask.any() or missing.any():
+        cols_arr = prices.columns.to_numpy()
+        per_col_counts = extreme_mask.sum(axis=0)
+        return_dates = prices.index[scan_start + 1:]
+        for j in np.flatnonzero(per_col_counts):
+            extreme_dates = return_dates[extreme_mask[:, j]].tolist()
+            warnings.append(f"{cols_arr[j]}: {per_col_counts[j]} extreme moves (>50%) detected on {extreme_dates}")
+
+        missing_pct = missing.mean(axis=0)
+        warnings.extend(f"{cols_arr[j]}: {missing_pct[j]:.1%} missing data" for j in np.flatnonzero(missing_pct > 0.1))
     
     date_range = (prices.index[-1] - prices.index[0]).days
     years = date_range / 365.25
     actual_trading_days_per_year = num_days / years if years > 0 else 252
     
-    return {
-        "valid": True,
-        "warnings": warnings,
-        "stats": {
-            "days": num_days,
-            "years": round(years, 2),
-            "actual_trading_days_per_year": round(actual_trading_days_per_year, 1)
-        }
-    }
+    return ValidationResult(
+        valid=True,
+        warnings=warnings,
+        stats=ValidationStats(
+            days=num_days,
+            years=round(years, 2),
+            actual_trading_days_per_year=round(actual_trading_days_per_year, 1)
+        )
+    )
+
+_rf_cache: Optional[tuple] = None
 
 def get_risk_free_rate() -> float:
+    """
+    3-month T-bill yield, memoized per UTC day in process and on disk. The
+    key uses the UTC date so every worker rolls over at the same moment
+    whatever the host's local timezone.
+    """
+    global _rf_cache
+    today = datetime.now(timezone.utc).date()
+    if _rf_cache is not None and _rf_cache[0] == today:
+        return _rf_cache[1]
     try:
-        tnx = yf.Ticker("^IRX")
-        hist = tnx.history(period="5d")
-        if not hist.empty:
-            return hist['Close'].iloc[-1] / 100
-        return 0.045  
+        rate = cached_call("risk_free", TTL_RISK_FREE, _fetch_risk_free_rate, tickers=["^IRX"], day=today.isoformat())
+        if rate is None:
+            return 0.045
+        _rf_cache = (today, rate)
+        return rate
     except:
         return 0.045  
 
-def get_chart_data(ticker: str, period: str = "1mo", interval: str = "1d") -> list[dict]:
+async def get_risk_free_rate_async() -> float:
+    return await asyncio.to_thread(get_risk_free_rate)
+
+def _fetch_risk_free_rate() -> Optional[float]:
+    tnx = _ticker("^IRX")
+    hist = _yahoo(tnx.history, period="5d")
+    if not hist.empty:
+        return float(hist['Close'].iloc[-1] / 100)
+    return None
+
+def get_chart_data(ticker: str, period: str = "1mo", interval: str = "1d", as_json: bool = False):
+    """
+    Chart points for a symbol. With as_json=True the records are returned
+    already encoded as JSON bytes, ready to hand to a FastAPI Response.
+    """
+    records = _chart_records(ticker, period, interval)
+    if as_json:
+        return orjson.dumps(records)
+    return records
+
+@ttl_cache(ttl=TTL_CHART_INTRADAY)
+def _chart_records(ticker: str, period: str, interval: str) -> list[dict]:
     try:
-        stock = yf.Ticker(ticker)
+        stock = _ticker(ticker)
         include_prepost = period == "1d"
-        hist = stock.history(period=period, interval=interval, prepost=include_prepost)
+        is_intraday = interval in INTRADAY_INTERVALS
+        hist = cached_call(
+            "chart", TTL_CHART_INTRADAY if is_intraday else TTL_CHART,
+            lambda: _yahoo(stock.history, period=period, interval=interval, prepost=include_prepost),
+            tickers=[ticker], period=period, interval=interval
+        )
         
         if hist.empty:
             return []
             
-        hist = hist.reset_index()
+        dates = pd.DatetimeIndex(hist.index)
         
+        if is_intraday:
+            dates_et = dates.tz_convert('America/New_York') if dates.tz is not None else dates
+            regular_mask = np.zeros(len(dates_et), dtype=bool)
+            regular_mask[dates_et.indexer_between_time(MARKET_OPEN, MARKET_CLOSE, include_end=False)] = True
+            date_strs = dates.strftime('%Y-%m-%d %H:%M')
+        else:
+            regular_mask = np.ones(len(dates), dtype=bool)
+            date_strs = dates.strftime('%Y-%m-%d')
         
-        results = []
-        for _, row in hist.iterrows():
-            date_col = 'Date' if 'Date' in hist.columns else 'Datetime'
-            date_val = row[date_col]
-            
-            is_regular = True
-            if interval in ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h']:
-                if isinstance(date_val, pd.Timestamp):
-                    if date_val.tzinfo is not None:
-                        date_et = date_val.tz_convert('America/New_York')
-                    else:
-                        date_et = date_val
-                        
-                    current_time = date_et.time()
-                    market_open = datetime.strptime("09:30", "%H:%M").time()
-                    market_close = datetime.strptime("16:00", "%H:%M").time()
-                    
-                    if current_time < market_open or current_time >= market_close:
-                        is_regular = False
-
-                date_str = date_val.strftime('%Y-%m-%d %H:%M')
-            else:
-                date_str = date_val.strftime('%Y-%m-%d')
-                
-            results.append({
-                "date": date_str,
-                "price": row['Close'],
-                "open": row['Open'],
-                "high": row['High'],
-                "low": row['Low'],
-                "close": row['Close'],
-                "volume": row.get('Volume', 0),
-                "isRegularMarket": is_regular
-            })
-            
-        return results
+        close = hist['Close'].tolist()
+        volume = hist['Volume'].tolist() if 'Volume' in hist.columns else [0] * len(close)
+        return [
+            {
+                "date": d,
+                "price": c,
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c,
+                "volume": v,
+                "isRegularMarket": r
+            }
+            for d, c, o, h, l, v, r in zip(
+                date_strs.tolist(), close, hist['Open'].tolist(), hist['High'].tolist(),
+                hist['Low'].tolist(), volume, regular_mask.tolist()
+            )
+        ]
     except Exception as e:
-        print(f"Error fetching chart data for {ticker}: {e}")
+        logger.error("Error fetching chart data for %s: %s", ticker, e)
         return []
 
-def get_stock_info(ticker: str) -> dict:
+def _download_close(tickers: list[str], start_date, end_date) -> pd.DataFrame:
+    raw_data = yf_download(tickers, start=start_date, end=end_date, progress=False, auto_adjust=True, group_by='column')
+    return raw_data['Close']
+
+def _match_financial_columns(dates: list, columns: pd.Index) -> np.ndarray:
+    """
+    Position of the latest financials column strictly before each date and
+    less than 120 days older than it, or -1 when there is none.
+    """
+    left = pd.DataFrame({"dt": pd.DatetimeIndex(dates), "pos": np.arange(len(dates))}).sort_values("dt")
+    col_dates = pd.to_datetime(columns)
+    right = pd.DataFrame({"col_dt": col_dates, "col_idx": np.arange(len(col_dates))}).sort_values("col_dt", kind="stable")
+    right = right.drop_duplicates("col_dt", keep="first")
+
+    merged = pd.merge_asof(left, right, left_on="dt", right_on="col_dt", direction="backward", allow_exact_matches=False)
+    merged = merged[(merged["dt"] - merged["col_dt"]) < pd.Timedelta(days=120)]
+
+    col_idx = np.full(len(dates), -1)
+    col_idx[merged["pos"].to_numpy()] = merged["col_idx"].to_numpy()
+    return col_idx
+
+def _five_year_window(cache_day: str) -> tuple:
+    end_date = datetime.fromisoformat(cache_day) + timedelta(days=1)
+    return end_date - timedelta(days=5*365 + 21), end_date
+
+@ttl_cache(ttl=TTL_HISTORICAL, maxsize=8)
+def _benchmark_5y(ticker: str, cache_day: str) -> pd.Series:
+    """
+    Five years of benchmark closes, shared by every get_stock_info call on
+    the same day. Backed by the disk cache so restarts reuse it as well.
+    A failed (empty or all-NaN) download comes back empty and, like every
+    ttl_cache result, is not memoized, so the next call retries it.
+    """
+    start_date, end_date = _five_year_window(cache_day)
+    data = cached_call(
+        "benchmark_5y", TTL_HISTORICAL,
+        lambda: _download_close([ticker], start_date, end_date),
+        tickers=[ticker], end=cache_day
+    )
+    if data is None or data.empty:
+        return pd.Series(dtype=np.float64, name=ticker)
+    return data.iloc[:, 0].dropna().rename(ticker)
+
+def _returns_comparison_prices(ticker: str, cache_day: str) -> pd.DataFrame:
+    start_date, end_date = _five_year_window(cache_day)
+    own = cached_call(
+        "returns_comparison", TTL_INFO,
+        lambda: _download_close([ticker], start_date, end_date),
+        tickers=[ticker], end=cache_day
+    )
+    return pd.concat([own, _benchmark_5y("^GSPC", cache_day)], axis=1).sort_index()
+
+def _nearest_positions(dates: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Position of the date nearest each target in a sorted datetime64 array,
+    preferring the later date on ties (as Index.get_indexer(method='nearest')).
+    """
+    before = np.searchsorted(dates, targets, side='right') - 1
+    after = np.searchsorted(dates, targets, side='left')
+    before_c = np.clip(before, 0, len(dates) - 1)
+    after_c = np.clip(after, 0, len(dates) - 1)
+    use_before = (after >= len(dates)) | ((before >= 0) & ((targets - dates[before_c]) < (dates[after_c] - targets)))
+    return np.where(use_before, before_c, after_c)
+
+def _period_returns(prices: pd.DataFrame, ticker: str, starts: dict) -> dict:
+    """
+    Percent return of ticker and ^GSPC from the row nearest each start date
+    to the last row. A horizon is None when no row lies within 10 days of it.
+    """
+    if ticker not in prices.columns or "^GSPC" not in prices.columns:
+        return dict.fromkeys(starts)
+
+    dates = prices.index.values
+    targets = pd.DatetimeIndex(list(starts.values())).values.astype(dates.dtype)
+    idx = _nearest_positions(dates, targets)
+    gaps = np.abs((dates[idx] - targets) // np.timedelta64(1, 'D'))
+
+    vals = prices[[ticker, "^GSPC"]].to_numpy(dtype=np.float64)
+    start_vals = vals[idx]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rets = (vals[-1] - start_vals) / start_vals * 100
+
+    out = {}
+    for key, gap, (t_ret, s_ret) in zip(starts, gaps, rets):
+        if gap > 10:
+            out[key] = None
+        else:
+            out[key] = {
+                "ticker": None if np.isnan(t_ret) else float(t_ret),
+                "spy": None if np.isnan(s_ret) else float(s_ret)
+            }
+    return out
+
+Result = namedtuple("Result", ["ok", "value"])
+
+def _safe(fn, *args, **kwargs) -> Result:
+    """Call fn, capturing either its return value or the exception it raised."""
+    try:
+        return Result(True, fn(*args, **kwargs))
+    except Exception as e:
+        return Result(False, e)
+
+def _fast_attr(fi, name: str):
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        value = getattr(fi, name)
+    except Exception:
+        return None
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+def _fast_quote(stock: yf.Ticker) -> dict:
+    fi = stock.fast_info
+    return {
+        "open": fi.open,
+        "dayHigh": fi.day_high,
+        "dayLow": fi.day_low,
+        "previousClose": fi.previous_close,
+        "marketCap": _fast_attr(fi, "market_cap"),
+        "fiftyTwoWeekHigh": _fast_attr(fi, "year_high"),
+        "fiftyTwoWeekLow": _fast_attr(fi, "year_low"),
+        "currency": _fast_attr(fi, "currency"),
+        "volume": _fast_attr(fi, "last_volume")
+    }
+
+_stock_info_memo = TTLStore(ttl=TTL_STOCK_INFO)
+
+def get_stock_info(ticker: str, fields: Optional[set] = None, stock: Optional[yf.Ticker] = None, info: Optional[dict] = None) -> dict:
+    """
+    Overview payload for ticker, memoized in process on (ticker, fields).
+    stock and info are fetch hints from batch callers (a shared Ticker handle
+    and an already-read info dict) and are deliberately not part of the key,
+    so batch and single-symbol lookups share entries.
+    """
+    key = (ticker, frozenset(fields) if fields is not None else None)
+    result = _stock_info_memo.get(key)
+    if result is None:
+        result = _get_stock_info(ticker, fields, stock, info)
+        if result:
+            _stock_info_memo.set(key, result)
+    return result
+
+def _get_stock_info(ticker: str, fields: Optional[set], stock: Optional[yf.Ticker], info: Optional[dict]) -> dict:
+    try:
+        if stock is None:
+            stock = _ticker(ticker)
+        want_info = fields is None or bool(fields & _INFO_FIELDS)
+        want_earnings = fields is None or bool(fields & _EARNINGS_FIELDS)
+        want_returns = fields is None or "returns" in fields
+
+        end_date = datetime.now()
+
+        if want_info and info is None:
+            f_info = _YF_POOL.submit(cached_call, "info", TTL_INFO, lambda: _yahoo(getattr, stock, "info"), tickers=[ticker])
+        f_quote = _YF_POOL.submit(_yahoo, _fast_quote, stock)
+        if want_earnings:
+            f_earn = _YF_POOL.submit(_safe, cached_call, "earnings_dates", TTL_INFO, lambda: _yahoo(getattr, stock, "earnings_dates"), tickers=[ticker])
+            f_fin = _YF_POOL.submit(_safe, cached_call, "quarterly_financials", TTL_INFO, lambda: _yahoo(getattr, stock, "quarterly_financials"), tickers=[ticker])
+        if want_returns:
+            f_returns = _YF_POOL.submit(_safe, _returns_comparison_prices, ticker, end_date.date().isoformat())
+
+        if info is None:
+            info = f_info.result() if want_info else {}
+        quote = f_quote.result()
         
         result = {
-            "marketCap": info.get("marketCap"),
+            "marketCap": quote["marketCap"] or info.get("marketCap"),
             "trailingPE": info.get("trailingPE"),
             "forwardPE": info.get("forwardPE"),
-            "fiftyTwoWeekHigh": info.get("fiftyTwoWeekHigh"),
-            "fiftyTwoWeekLow": info.get("fiftyTwoWeekLow"),
+            "fiftyTwoWeekHigh": quote["fiftyTwoWeekHigh"] or info.get("fiftyTwoWeekHigh"),
+            "fiftyTwoWeekLow": quote["fiftyTwoWeekLow"] or info.get("fiftyTwoWeekLow"),
             "dividendRate": info.get("dividendRate"),
             "dividendYield": info.get("dividendYield"),
-            "currency": info.get("currency", "USD"),
+            "currency": quote["currency"] or info.get("currency", "USD"),
             "shortName": info.get("shortName"),
             "longName": info.get("longName"),
             "sector": info.get("sector"),
@@ -198,180 +655,165 @@ def get_stock_info(ticker: str) -> dict:
             "exDividendDate": info.get("exDividendDate"),
             "lastDividendValue": info.get("lastDividendValue"),
             "trailingEps": info.get("trailingEps"),
-            "volume": info.get("regularMarketVolume") or info.get("volume"),
+            "volume": quote["volume"] or info.get("regularMarketVolume") or info.get("volume"),
             "averageVolume": info.get("averageVolume"),
             "beta": info.get("beta"),
             "earnings": None,
             "ipoDate": None,  
-            "open": stock.fast_info.open,
-            "dayHigh": stock.fast_info.day_high,
-            "dayLow": stock.fast_info.day_low,
-            "previousClose": stock.fast_info.previous_close
+            "open": quote["open"],
+            "dayHigh": quote["dayHigh"],
+            "dayLow": quote["dayLow"],
+            "previousClose": quote["previousClose"]
         }
         
         try:
             first_trade_epoch = info.get("firstTradeDateEpochUtc")
             if first_trade_epoch:
-                from datetime import datetime
                 result["ipoDate"] = datetime.utcfromtimestamp(first_trade_epoch).strftime("%Y-%m-%d")
         except Exception:
             pass  
 
-        try:
-            earnings_dates = stock.earnings_dates
-            financials = stock.quarterly_financials
+        earnings_res = f_earn.result() if want_earnings else None
+        if earnings_res is not None and not earnings_res.ok:
+            logger.error("Error fetching earnings for %s: %s", ticker, earnings_res.value)
+            result["debug_earnings_error"] = str(earnings_res.value)
+        elif earnings_res is not None:
+            try:
+                earnings_dates = earnings_res.value
+                financials_res = f_fin.result()
+                financials = financials_res.value if financials_res.ok else None
             
-            history = []
+                history = []
+                history_dates = []
             
-            if earnings_dates is not None and not earnings_dates.empty:
-                earnings_dates = earnings_dates.sort_index(ascending=False)
+                if earnings_dates is not None and not earnings_dates.empty:
+                    earnings_dates = earnings_dates.sort_index(ascending=False)
                 
-                recent_earnings = earnings_dates.head(8)
+                    recent_earnings = earnings_dates.head(8)
                 
-                for date, row in recent_earnings.iterrows():
-                    if pd.isna(row.get("Reported EPS")):
-                        continue
-                        
-                    month = date.month
-                    year = date.year
-                    quarter_label = "Q?"
-                    
-                    fy_year = year
-                    if month in [1, 2, 3]:
-                        q_num = 4
-                        fy_year = year - 1
-                    elif month in [4, 5, 6]:
-                        q_num = 1
-                    elif month in [7, 8, 9]:
-                        q_num = 2
-                    elif month in [10, 11, 12]:
-                        q_num = 3
+                    num_recent = len(recent_earnings)
+                    reported_eps = recent_earnings["Reported EPS"].to_numpy() if "Reported EPS" in recent_earnings.columns else np.full(num_recent, np.nan)
+                    estimated_eps = recent_earnings["EPS Estimate"].to_numpy() if "EPS Estimate" in recent_earnings.columns else [None] * num_recent
+                
+                    for date, eps_reported, eps_estimate in zip(recent_earnings.index, reported_eps, estimated_eps):
+                        if pd.isna(eps_reported):
+                            continue
                         
-                    quarter_label = f"Q{q_num} FY{str(fy_year)[2:]}"
+                        q_num, fy_offset = _Q_TABLE[date.month]
+                        quarter_label = f"Q{q_num} FY{str(date.year + fy_offset)[2:]}"
                     
-                    entry = {
-                        "quarter": quarter_label,
-                        "date": date.strftime("%Y-%m-%d"),
-                        "epsEstimate": row.get("EPS Estimate"),
-                        "epsReported": row.get("Reported EPS"),
-                        "revenue": None,
-                        "earnings": None
-                    }
-                    
-                    if financials is not None and not financials.empty:
-                        cols = pd.to_datetime(financials.columns)
-                        potential_dates = [d for d in cols if d < date.replace(tzinfo=None)]
-                        
-                        if potential_dates:
-                            closest_date = max(potential_dates)
-                            if (date.replace(tzinfo=None) - closest_date).days < 120:
-                                col_idx = list(cols).index(closest_date)
-                                orig_col = financials.columns[col_idx]
-                                
-                                if "Total Revenue" in financials.index:
-                                    entry["revenue"] = financials.loc["Total Revenue", orig_col]
-                                if "Net Income" in financials.index:
-                                    entry["earnings"] = financials.loc["Net Income", orig_col]
+                        entry = {
+                            "quarter": quarter_label,
+                            "date": date.strftime("%Y-%m-%d"),
+                            "epsEstimate": eps_estimate,
+                            "epsReported": eps_reported,
+                            "revenue": None,
+                            "earnings": None
+                        }
                     
-                    history.append(entry)
+                        history.append(entry)
+                        history_dates.append(date.replace(tzinfo=None))
                     
-                    if len(history) >= 4:
-                        break
+                        if len(history) >= 4:
+                            break
             
+                if history and financials is not None and not financials.empty:
+                    col_idx = _match_financial_columns(history_dates, financials.columns)
+                    for row_name, key in (("Total Revenue", "revenue"), ("Net Income", "earnings")):
+                        if row_name in financials.index:
+                            row_vals = financials.loc[row_name].to_numpy()
+                            for entry, j in zip(history, col_idx):
+                                if j >= 0:
+                                    entry[key] = row_vals[j]
             
-            result["earningsHistory"] = history[::-1]
             
-            next_earnings_date = None
-            if earnings_dates is not None and not earnings_dates.empty:
-                from datetime import datetime
-                now = datetime.now()
-                for date, row in earnings_dates.sort_index(ascending=True).iterrows():
-                    if pd.isna(row.get("Reported EPS")) and date.replace(tzinfo=None) > now:
-                        next_earnings_date = date.strftime("%Y-%m-%d")
-                        break
-            result["nextEarningsDate"] = next_earnings_date
+                result["earningsHistory"] = history[::-1]
+            
+                next_earnings_date = None
+                if earnings_dates is not None and not earnings_dates.empty:
+                    # Already sorted newest first above; reverse and binary-search
+                    # for the first date after now, then take the first unreported one.
+                    upcoming = earnings_dates.iloc[::-1]
+                    upcoming_dates = upcoming.index.tz_localize(None) if upcoming.index.tz is not None else upcoming.index
+                    first = upcoming_dates.searchsorted(datetime.now(), side="right")
+                    if "Reported EPS" in upcoming.columns:
+                        unreported = np.flatnonzero(upcoming["Reported EPS"].isna().to_numpy()[first:])
+                    else:
+                        unreported = np.arange(len(upcoming) - first)
+                    if unreported.size:
+                        next_earnings_date = upcoming.index[first + unreported[0]].strftime("%Y-%m-%d")
+                result["nextEarningsDate"] = next_earnings_date
             
-            if history:
-                latest = history[-1]
-                result["earnings"] = {
-                    "quarter": latest["quarter"],
-                    "date": latest["date"],
-                    "eps": {
-                        "estimate": latest["epsEstimate"],
-                        "reported": latest["epsReported"],
-                        "surprise": ((latest["epsReported"] - latest["epsEstimate"]) / abs(latest["epsEstimate"]) * 100) if latest["epsEstimate"] else 0
-                    },
-                    "revenue": {
-                        "reported": latest["revenue"],
-                        "date": latest["date"] 
+                if history:
+                    latest = history[-1]
+                    result["earnings"] = {
+                        "quarter": latest["quarter"],
+                        "date": latest["date"],
+                        "eps": {
+                            "estimate": latest["epsEstimate"],
+                            "reported": latest["epsReported"],
+                            "surprise": ((latest["epsReported"] - latest["epsEstimate"]) / abs(latest["epsEstimate"]) * 100) if latest["epsEstimate"] else 0
+                        },
+                        "revenue": {
+                            "reported": latest["revenue"],
+                            "date": latest["date"] 
+                        }
                     }
-                }
-
-        except Exception as e:
-            print(f"Error fetching earnings for {ticker}: {e}")
-            result["debug_earnings_error"] = str(e)
 
-        except Exception as e:
-            print(f"Error fetching earnings for {ticker}: {e}")
+            except Exception as e:
+                logger.error("Error fetching earnings for %s: %s", ticker, e)
+                result["debug_earnings_error"] = str(e)
 
-        try:
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=5*365 + 20) 
-            
-            tickers_list = [ticker, "^GSPC"]
-            data = yf.download(tickers_list, start=start_date, end=end_date, progress=False)['Adj Close']
-            
-            
-            if not data.empty and isinstance(data, pd.DataFrame):
-                if ticker not in data.columns:
-                    pass 
-                
-                def get_return(period_days=None, is_ytd=False):
-                    try:
-                        if is_ytd:
-                            start = datetime(end_date.year, 1, 1)
-                        else:
-                            start = end_date - timedelta(days=period_days)
-                        
-                        
-                        latest_prices = data.iloc[-1]
-                        
-                        idx = data.index.get_indexer([start], method='nearest')[0]
-                        start_prices = data.iloc[idx]
-                        found_date = data.index[idx]
-                        
-                        if abs((found_date - start).days) > 10:
-                            return None
-                        
-                        t_ret = ((latest_prices[ticker] - start_prices[ticker]) / start_prices[ticker]) * 100
-                        s_ret = ((latest_prices["^GSPC"] - start_prices["^GSPC"]) / start_prices["^GSPC"]) * 100
-                        
-                        return {
-                            "ticker": t_ret if not pd.isna(t_ret) else None,
-                            "spy": s_ret if not pd.isna(s_ret) else None
-                        }
-                    except Exception as ex:
-                        return None
-
-                result["returns"] = {
-                    "ytd": get_return(is_ytd=True),
-                    "1y": get_return(365),
-                    "3y": get_return(365*3),
-                    "5y": get_return(365*5)
-                }
-        except Exception as e:
-            print(f"Error fetching returns comparison: {e}")
-            result["debug_returns_error"] = str(e)
+        returns_res = f_returns.result() if want_returns else None
+        if returns_res is not None and not returns_res.ok:
+            logger.error("Error fetching returns comparison: %s", returns_res.value)
+            result["debug_returns_error"] = str(returns_res.value)
+        elif returns_res is not None and not returns_res.value.empty:
+            result["returns"] = _period_returns(returns_res.value, ticker, {
+                "ytd": datetime(end_date.year, 1, 1),
+                "1y": end_date - timedelta(days=365),
+                "3y": end_date - timedelta(days=365*3),
+                "5y": end_date - timedelta(days=365*5)
+            })
 
         return result
     except Exception as e:
-        print(f"Error fetching stock info for {ticker}: {e}")
+        logger.error("Error fetching stock info for %s: %s", ticker, e)
         return {}
 
+def get_stock_info_batch(tickers: list[str], fields: Optional[set] = None) -> dict:
+    """
+    get_stock_info for several symbols, sharing one yf.Tickers session per
+    shard of YF_BATCH_SIZE symbols and fetching the shard's symbols concurrently.
+    Cached info payloads for the whole shard are read in a single lookup.
+    """
+    want_info = fields is None or bool(fields & _INFO_FIELDS)
+    results = {}
+    for i in range(0, len(tickers), YF_BATCH_SIZE):
+        group = tickers[i:i + YF_BATCH_SIZE]
+        handles = yf.Tickers(" ".join(group)).tickers
+        infos = cached_values("info", [{"tickers": [t]} for t in group]) if want_info else [None] * len(group)
+        futures = {
+            t: _SYMBOL_POOL.submit(get_stock_info, t, fields, handles.get(t.upper()), info)
+            for t, info in zip(group, infos)
+        }
+        for t, future in futures.items():
+            results[t] = future.result()
+    return results
+
+def get_stock_infos(tickers: list[str], fields: Optional[set] = None) -> dict:
+    """Alias of get_stock_info_batch."""
+    return get_stock_info_batch(tickers, fields)
+
+def get_chart_data_batch(tickers: list[str], period: str = "1mo", interval: str = "1d") -> dict:
+    """get_chart_data for several symbols, fetched concurrently."""
+    futures = {t: _YF_POOL.submit(get_chart_data, t, period, interval) for t in tickers}
+    return {t: future.result() for t, future in futures.items()}
+
 def get_analyst_ratings(ticker: str) -> dict:
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
+        stock = _ticker(ticker)
+        info = cached_call("info", TTL_INFO, lambda: _yahoo(getattr, stock, "info"), tickers=[ticker])
         
         targets = {
             "current": info.get("currentPrice"),
@@ -393,23 +835,21 @@ def get_analyst_ratings(ticker: str) -> dict:
             "recommendation": recommendation
         }
     except Exception as e:
-        print(f"Error fetching analyst ratings for {ticker}: {e}")
+        logger.error("Error fetching analyst ratings for %s: %s", ticker, e)
         return {}
 
 def get_latest_price(ticker: str) -> dict:
     try:
-        stock = yf.Ticker(ticker)
+        stock = _ticker(ticker)
         
-        hist = stock.history(period="1d", interval="1m", prepost=True)
+        hist = _yahoo(stock.history, period="1d", interval="1m", prepost=True)
         
         if hist.empty:
-            fi = stock.fast_info
-            current_price = fi.last_price
-            prev_close = fi.previous_close
+            current_price = _yahoo(getattr, stock.fast_info, "last_price")
         else:
             current_price = hist['Close'].iloc[-1]
-            
-            prev_close = stock.fast_info.previous_close
+        
+        prev_close = _yahoo(getattr, stock.fast_info, "previous_close")
 
         if prev_close and not pd.isna(prev_close):
             change = current_price - prev_close
@@ -425,13 +865,98 @@ def get_latest_price(ticker: str) -> dict:
         }
 
     except Exception as e:
-        print(f"Error fetching latest price for {ticker}: {e}")
+        logger.error("Error fetching latest price for %s: %s", ticker, e)
         return {"price": 0, "change": 0, "percent_change": 0}
 
 
+def fetch_latest_prices(tickers: list[str]) -> dict:
+    """
+    Latest price for several symbols, one Yahoo request per shard of
+    YF_BATCH_SIZE symbols instead of a history call per symbol. Symbols
+    Yahoo returns nothing for map to None.
+    """
+    prices = dict.fromkeys(tickers)
+    for i in range(0, len(tickers), YF_BATCH_SIZE):
+        group = tickers[i:i + YF_BATCH_SIZE]
+        raw_data = yf_download(
+            group, period="1d", interval="1m", prepost=True, progress=False,
+            auto_adjust=True, group_by='column', threads=True, multi_level_index=True
+        )
+        if raw_data.empty or 'Close' not in raw_data.columns:
+            continue
+
+        close = raw_data['Close']
+        requested = {t.upper(): t for t in group}
+        # Thinly traded symbols skip minutes, so take each column's last quote
+        # rather than the frame's last row.
+        filled, _ = _ffill_2d(close.to_numpy(dtype=np.float64))
+        for sym, price in zip(close.columns, filled[-1]):
+            if sym in requested and not np.isnan(price):
+                prices[requested[sym]] = float(price)
+    return prices
+
+
+def fetch_info_parallel(tickers: list[str], timeout: float = OVERVIEW_TIMEOUT) -> dict:
+    """
+    Stock info, analyst ratings and latest quote for each symbol, all fetched
+    concurrently. Whatever has not finished within timeout seconds is
+    reported as None (and cancelled if still queued) so one slow symbol cannot
+    hold up the rest. Only as many symbols as the Yahoo rate limiter can serve
+    within the timeout are started; the rest are reported as None as well.
+    """
+    budget = yahoo_bucket.capacity + yahoo_bucket.rate * timeout
+    max_symbols = max(1, int(budget // OVERVIEW_REQUESTS_PER_SYMBOL))
+    if len(tickers) > max_symbols:
+        logger.warning("Overview limited to %s of %s symbols within %ss", max_symbols, len(tickers), timeout)
+
+    futures = {}
+    for t in tickers[:max_symbols]:
+        futures[(t, "info")] = _SYMBOL_POOL.submit(get_stock_info, t)
+        futures[(t, "ratings")] = _YF_POOL.submit(get_analyst_ratings, t)
+        futures[(t, "quote")] = _YF_POOL.submit(get_latest_price, t)
+
+    done, not_done = wait(futures.values(), timeout=timeout)
+    for future in not_done:
+        future.cancel()
+    results = {t: {"info": None, "ratings": None, "quote": None} for t in tickers}
+    for (t, part), future in futures.items():
+        if future not in done:
+            logger.warning("%s for %s timed out after %ss", part, t, timeout)
+            continue
+        res = _safe(future.result)
+        if res.ok:
+            results[t][part] = res.value
+        else:
+            logger.warning("%s for %s failed: %s", part, t, res.value)
+    return results
+
+
+def _holding_period(holding_days: int) -> str:
+    years = holding_days // 365
+    months = (holding_days % 365) // 30
+    if years > 0 and months > 0:
+        return f"{years}y {months}m"
+    elif years > 0:
+        return f"{years}y"
+    return f"{months}m" if months > 0 else f"{holding_days}d"
+
+@lru_cache(maxsize=4096)
+def _first_trade_date(ticker: str) -> str:
+    """
+    Earliest date Yahoo has bars for, memoized for the process lifetime. The
+    history metadata carries it, so decades of daily bars are only pulled
+    when the metadata lacks it. Raises LookupError (not cached) without data.
+    """
+    stock = _ticker(ticker)
+    first_trade = (_yahoo(lambda: stock.history_metadata) or {}).get("firstTradeDate")
+    if first_trade:
+        return datetime.utcfromtimestamp(first_trade).strftime("%Y-%m-%d")
+    max_hist = _yahoo(stock.history, period="max")
+    if max_hist.empty:
+        raise LookupError(ticker)
+    return max_hist.index[0].strftime("%Y-%m-%d")
+
 def calculate_whatif(ticker: str, start_date: str, amount: float) -> dict:
-    from datetime import datetime, timedelta
-    
     if amount <= 0:
         return {"valid": False, "error": "Amount must be greater than 0"}
     
@@ -445,18 +970,18 @@ def calculate_whatif(ticker: str, start_date: str, amount: float) -> dict:
         return {"valid": False, "error": "Date must be in the past"}
     
     try:
-        stock = yf.Ticker(ticker)
+        stock = _ticker(ticker)
         
         end_search = target_date + timedelta(days=10)
-        hist = stock.history(start=target_date.strftime("%Y-%m-%d"), 
-                            end=end_search.strftime("%Y-%m-%d"))
+        hist = _yahoo(stock.history, start=target_date.strftime("%Y-%m-%d"),
+                      end=end_search.strftime("%Y-%m-%d"))
         
         if hist.empty:
-            max_hist = stock.history(period="max")
-            if max_hist.empty:
+            try:
+                first_date = _first_trade_date(ticker.upper())
+            except LookupError:
                 return {"valid": False, "error": f"No data available for {ticker}"}
             
-            first_date = max_hist.index[0].strftime("%Y-%m-%d")
             return {"valid": False, "error": f"Date is before available data. Earliest: {first_date}"}
         
         actual_buy_date = hist.index[0]
@@ -464,10 +989,9 @@ def calculate_whatif(ticker: str, start_date: str, amount: float) -> dict:
         
         shares = amount / buy_price
         
-        current_hist = stock.history(period="1d")
+        current_hist = _yahoo(stock.history, period="1d")
         if current_hist.empty:
-            fi = stock.fast_info
-            current_price = fi.last_price
+            current_price = _yahoo(getattr, stock.fast_info, "last_price")
         else:
             current_price = current_hist.iloc[-1]['Close']
         
@@ -483,14 +1007,7 @@ def calculate_whatif(ticker: str, start_date: str, amount: float) -> dict:
         else:
             annualized_return = gain_percent
         
-        years = holding_days // 365
-        months = (holding_days % 365) // 30
-        if years > 0 and months > 0:
-            holding_str = f"{years}y {months}m"
-        elif years > 0:
-            holding_str = f"{years}y"
-        else:
-            holding_str = f"{months}m" if months > 0 else f"{holding_days}d"
+        holding_str = _holding_period(holding_days)
         
         return {
             "valid": True,
@@ -509,5 +1026,105 @@ def calculate_whatif(ticker: str, start_date: str, amount: float) -> dict:
         }
         
     except Exception as e:
-        print(f"Error calculating whatif for {ticker}: {e}")
+        logger.error("Error calculating whatif for %s: %s", ticker, e)
         return {"valid": False, "error": str(e)}
+
+
+def calculate_whatif_batch(tickers: list[str], start_dates: list[str], amount: float) -> list[dict]:
+    """
+    calculate_whatif for aligned lists of symbols and start dates. Closes for
+    every symbol come from one sharded download and the gain arithmetic runs
+    over whole arrays. Results are in input order.
+    """
+    if amount <= 0:
+        return [{"valid": False, "error": "Amount must be greater than 0"} for _ in tickers]
+
+    today = datetime.now()
+    targets = pd.to_datetime(pd.Series(start_dates), format="%Y-%m-%d", errors="coerce")
+    results = [None] * len(tickers)
+    pending = []
+    for i, target in enumerate(targets):
+        if pd.isna(target):
+            results[i] = {"valid": False, "error": "Invalid date format. Use YYYY-MM-DD"}
+        elif target >= today:
+            results[i] = {"valid": False, "error": "Date must be in the past"}
+        else:
+            pending.append(i)
+    if not pending:
+        return results
+
+    symbols = sorted({tickers[i].upper() for i in pending})
+    first_date = min(targets[i] for i in pending)
+    closes = _download_closes(symbols, first_date.strftime("%Y-%m-%d"), (today + timedelta(days=1)).strftime("%Y-%m-%d"), "1d")
+    if closes.empty:
+        for i in pending:
+            results[i] = {"valid": False, "error": f"No data available for {tickers[i]}"}
+        return results
+    if closes.index.tz is not None:
+        closes.index = closes.index.tz_localize(None)
+
+    raw = closes.to_numpy(dtype=np.float64)
+    current, _ = _ffill_2d(raw)
+    dates = closes.index.values
+    col_of = {sym: j for j, sym in enumerate(closes.columns)}
+
+    # Mirrors calculate_whatif: buy at the first close within 10 days of the
+    # requested date, and report the earliest quote for dates before it. The
+    # download starts at the earliest requested date, so a column's first
+    # quote is the symbol's first quote whenever a target precedes it.
+    has_quote = ~np.isnan(raw)
+    first_quote = np.where(has_quote.any(axis=0), has_quote.argmax(axis=0), -1)
+    rows, cols, found = [], [], []
+    for i in pending:
+        j = col_of.get(tickers[i].upper())
+        target = targets[i].to_datetime64()
+        start = np.searchsorted(dates, target, side='left')
+        stop = np.searchsorted(dates, target + np.timedelta64(10, 'D'), side='left')
+        quoted = np.flatnonzero(has_quote[start:stop, j]) if j is not None else []
+        if len(quoted) == 0:
+            if j is not None and first_quote[j] >= 0 and target < dates[first_quote[j]]:
+                earliest = closes.index[first_quote[j]].strftime("%Y-%m-%d")
+                results[i] = {"valid": False, "error": f"Date is before available data. Earliest: {earliest}"}
+            else:
+                results[i] = {"valid": False, "error": f"No data available for {tickers[i]}"}
+            continue
+        rows.append(start + quoted[0])
+        cols.append(j)
+        found.append(i)
+    if not found:
+        return results
+
+    rows, cols = np.array(rows), np.array(cols)
+    buy_price = raw[rows, cols]
+    current_price = current[-1, cols]
+    buy_dates = closes.index[rows]
+    holding_days = (pd.Timestamp(today) - buy_dates).days.to_numpy()
+
+    shares = amount / buy_price
+    current_value = shares * current_price
+    gain = current_value - amount
+    gain_percent = gain / amount * 100
+    holding_years = holding_days / 365.25
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annualized_return = np.where(
+            holding_years > 0, ((current_value / amount) ** (1 / holding_years) - 1) * 100, gain_percent
+        )
+
+    buy_date_strs = buy_dates.strftime("%Y-%m-%d")
+    for k, i in enumerate(found):
+        results[i] = {
+            "valid": True,
+            "error": None,
+            "buyDate": buy_date_strs[k],
+            "buyPrice": round(float(buy_price[k]), 2),
+            "shares": round(float(shares[k]), 4),
+            "currentPrice": round(float(current_price[k]), 2),
+            "currentValue": round(float(current_value[k]), 2),
+            "gain": round(float(gain[k]), 2),
+            "gainPercent": round(float(gain_percent[k]), 2),
+            "annualizedReturn": round(float(annualized_return[k]), 2),
+            "holdingDays": int(holding_days[k]),
+            "holdingPeriod": _holding_period(int(holding_days[k])),
+            "splitAdjusted": True
+        }
+    return results
@@ -1,28 +1,51 @@
 import sys
 import os
+import asyncio
+import logging
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 import pandas as pd
 from datetime import datetime
+import orjson
 
-from data import fetch_historical_data, fetch_benchmark_data, get_risk_free_rate
-from optimizer import optimize_portfolio
+from data import fetch_historical_data_async, fetch_benchmark_data_async, get_risk_free_rate_async
+from optimizer import optimize_portfolio, calculate_efficient_frontier, capital_market_line, compute_return_stats
 from backtester import run_backtest
 from stress_tester import StressTester
 
+from cache import TTLStore, TTL_OPTIMIZE
 from rate_limiter import limiter, rate_limit_handler, RATE_LIMITS
 from validators import InputValidator
 from slowapi.errors import RateLimitExceeded
 
+# Per-step progress is logged at DEBUG, so under the default INFO level the
+# hot handlers skip formatting it entirely.
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+def _dumps(content) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """
+    orjson response that also accepts NumPy arrays and scalars and non-string
+    dict keys, and writes NaN as null instead of failing.
+    """
+
+    def render(self, content) -> bytes:
+        return _dumps(content)
+
 app = FastAPI(
     title="Portfolio Optimizer API",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    default_response_class=NumpyORJSONResponse
 )
 
 app.state.limiter = limiter
@@ -39,7 +62,10 @@ app.add_middleware(
 )
 
 class PortfolioRequest(BaseModel):
-    tickers: list[str]
+    # Frozen so a request is hashable and can key the response cache directly.
+    model_config = ConfigDict(frozen=True, extra="forbid")
+    
+    tickers: tuple[str, ...]
     start_date: str
     end_date: str
     objective: str
@@ -50,6 +76,12 @@ class PortfolioRequest(BaseModel):
     frequency: str = "daily"
     mar: float = 0.0  
     rebalance_freq: str = "never"  
+    compute_frontier: bool = True
+    num_portfolios: int = 150
+
+# Whole /api/optimize responses keyed on the request body, so a repeated
+# identical request skips the fetch, the optimizer and the frontier sweep.
+_optimize_results = TTLStore(ttl=TTL_OPTIMIZE, maxsize=64)
 
 @app.get("/")
 @limiter.limit(RATE_LIMITS["general"])
@@ -61,55 +93,95 @@ def read_root(request: Request):
 def health_check(request: Request):
     return {"status": "healthy"}
 
-@app.post("/api/optimize")
-@limiter.limit(RATE_LIMITS["compute_intensive"])
-async def optimize(request: Request, portfolio_request: PortfolioRequest):
-    try:
-        InputValidator.validate_tickers(portfolio_request.tickers)
-        InputValidator.validate_weight_constraints(portfolio_request.min_weight, portfolio_request.max_weight)
-        InputValidator.validate_capital(portfolio_request.initial_capital)
-        InputValidator.validate_mar(portfolio_request.mar)
-        InputValidator.validate_objective(portfolio_request.objective)
-        InputValidator.validate_frequency(portfolio_request.frequency)
-        
-        interval = "1d"
-        annualization_factor = 252
-        
-        if portfolio_request.frequency == "monthly":
-            interval = "1mo"
-            annualization_factor = 12
+def _validate_portfolio_request(portfolio_request: PortfolioRequest) -> None:
+    InputValidator.validate_tickers(portfolio_request.tickers)
+    InputValidator.validate_weight_constraints(portfolio_request.min_weight, portfolio_request.max_weight)
+    InputValidator.validate_capital(portfolio_request.initial_capital)
+    InputValidator.validate_mar(portfolio_request.mar)
+    InputValidator.validate_objective(portfolio_request.objective)
+    InputValidator.validate_frequency(portfolio_request.frequency)
+    if portfolio_request.compute_frontier:
+        InputValidator.validate_num_portfolios(portfolio_request.num_portfolios)
 
-        print(f"Fetching data for {portfolio_request.tickers} from {portfolio_request.start_date} to {portfolio_request.end_date} ({portfolio_request.frequency})")
-        prices = fetch_historical_data(portfolio_request.tickers, portfolio_request.start_date, portfolio_request.end_date, interval=interval)
-        
-        if prices.empty:
-            raise HTTPException(status_code=400, detail="No data found for the provided tickers and date range.")
-        
-        from data import validate_price_data
-        validation = validate_price_data(prices, min_days=60)
-        
-        if not validation["valid"]:
-            raise HTTPException(status_code=400, detail=validation["warnings"][0])
-        
-        if validation["warnings"]:
-            print(f"Data quality warnings: {validation['warnings']}")
-        
-        actual_ann_factor = validation["stats"].get("actual_trading_days_per_year", annualization_factor)
-        print(f"Using actual annualization factor: {actual_ann_factor} (vs default {annualization_factor})")
+_OPTIMIZE_SECTIONS = ("optimization", "backtest", "efficient_frontier", "parameters", "warnings")
 
-        rf_rate = get_risk_free_rate()
-        
-        print(f"Fetching benchmark data ({portfolio_request.benchmark}) for Beta/SML calculations")
-        benchmark_data = fetch_benchmark_data(portfolio_request.start_date, portfolio_request.end_date, portfolio_request.benchmark)
-        
-        if benchmark_data.empty:
-            print(f"WARNING: Could not fetch benchmark data for {portfolio_request.benchmark}. SML will be disabled.")
-            benchmark_prices = None
-        else:
-            benchmark_prices = benchmark_data
-        
-        print(f"Running optimization with objective: {portfolio_request.objective}")
-        optimization_result = optimize_portfolio(
+async def _optimize_stages(portfolio_request: PortfolioRequest):
+    """
+    Run the /api/optimize pipeline, yielding (section, payload) for each
+    section of the response as soon as it is ready: the optimization first,
+    then the backtest and the frontier in whichever order they finish, then
+    the parameters and warnings. The assembled response is cached as a whole.
+    """
+    cached = _optimize_results.get(portfolio_request)
+    if cached is not None:
+        for section in _OPTIMIZE_SECTIONS:
+            yield section, cached[section]
+        return
+    
+    interval = "1d"
+    annualization_factor = 252
+    
+    if portfolio_request.frequency == "monthly":
+        interval = "1mo"
+        annualization_factor = 12
+
+    logger.debug("Fetching data for %s from %s to %s (%s), benchmark %s",
+                 portfolio_request.tickers, portfolio_request.start_date, portfolio_request.end_date,
+                 portfolio_request.frequency, portfolio_request.benchmark)
+    prices, benchmark_data, rf_rate = await asyncio.gather(
+        fetch_historical_data_async(portfolio_request.tickers, portfolio_request.start_date, portfolio_request.end_date, interval),
+        fetch_benchmark_data_async(portfolio_request.start_date, portfolio_request.end_date, portfolio_request.benchmark),
+        get_risk_free_rate_async()
+    )
+    
+    if prices.empty:
+        raise HTTPException(status_code=400, detail="No data found for the provided tickers and date range.")
+    
+    from data import validate_price_data
+    validation = validate_price_data(prices, min_days=60)
+    
+    if not validation.valid:
+        raise HTTPException(status_code=400, detail=validation.warnings[0])
+    
+    if validation.warnings:
+        logger.info("Data quality warnings: %s", validation.warnings)
+    
+    actual_ann_factor = validation.stats.actual_trading_days_per_year or annualization_factor
+    logger.debug("Using actual annualization factor: %s (vs default %s)", actual_ann_factor, annualization_factor)
+
+    if benchmark_data.empty:
+        logger.warning("Could not fetch benchmark data for %s. SML will be disabled.", portfolio_request.benchmark)
+        benchmark_prices = None
+    else:
+        benchmark_prices = benchmark_data
+    
+    # Returns and covariance are shared by the optimizer, the frontier and
+    # the backtest rather than derived from prices in each of them.
+    return_stats = await asyncio.to_thread(compute_return_stats, prices)
+    
+    # The frontier sweep only needs the shared stats and the backtest only
+    # needs the optimal weights, so the sweep starts straight away in a
+    # worker thread and keeps running alongside the optimizer and then
+    # the backtest. Callers that don't chart the frontier can skip it.
+    logger.debug("Running optimization for objective: %s", portfolio_request.objective)
+    pending = {}
+    if portfolio_request.compute_frontier:
+        frontier_task = asyncio.ensure_future(asyncio.to_thread(
+            calculate_efficient_frontier,
+            prices,
+            risk_free_rate=rf_rate,
+            min_weight=portfolio_request.min_weight,
+            max_weight=portfolio_request.max_weight,
+            annualization_factor=annualization_factor,
+            num_portfolios=portfolio_request.num_portfolios,
+            benchmark_prices=benchmark_prices,
+            stats=return_stats
+        ))
+        pending[frontier_task] = "efficient_frontier"
+    response = {"efficient_frontier": None}
+    try:
+        optimization_result = await asyncio.to_thread(
+            optimize_portfolio,
             prices, 
             objective=portfolio_request.objective, 
             risk_free_rate=rf_rate,
@@ -117,44 +189,19 @@ async def optimize(request: Request, portfolio_request: PortfolioRequest):
             max_weight=portfolio_request.max_weight,
             annualization_factor=annualization_factor,
             mar=portfolio_request.mar,
-            benchmark_prices=benchmark_prices
+            benchmark_prices=benchmark_prices,
+            stats=return_stats
         )
         
         if not optimization_result["success"]:
             raise HTTPException(status_code=500, detail=f"Optimization failed: {optimization_result['message']}")
         
-        print(f"Calculating efficient frontier for objective: {portfolio_request.objective}")
-        from optimizer import calculate_efficient_frontier
-        
-        is_sharpe = portfolio_request.objective == "sharpe"
-        pass_weights = optimization_result["weights"] if is_sharpe else None
+        response["optimization"] = optimization_result
+        yield "optimization", optimization_result
         
-        efficient_frontier_data = calculate_efficient_frontier(
-            prices,
-            optimal_weights=pass_weights,
-            risk_free_rate=rf_rate,
-            min_weight=portfolio_request.min_weight,
-            max_weight=portfolio_request.max_weight,
-            annualization_factor=annualization_factor,
-            num_portfolios=150,
-            benchmark_prices=benchmark_prices
-        )
-
-        
-        if is_sharpe:
-            print("Forcing Max Sharpe consistency with main optimization results")
-            efficient_frontier_data["optimal_portfolio"] = {
-                "return": optimization_result["metrics"]["expected_return"],
-                "volatility": optimization_result["metrics"]["volatility"],
-                "sharpe_ratio": optimization_result["metrics"]["sharpe_ratio"],
-                "weights": optimization_result["weights"]
-            }
-        else:
-            print(f"Objective is {portfolio_request.objective}, skipping Max Sharpe override")
-            
-        print("Running backtest...")
-        benchmark_data = fetch_benchmark_data(portfolio_request.start_date, portfolio_request.end_date, portfolio_request.benchmark)
-        backtest_result = run_backtest(
+        logger.debug("Running backtest...")
+        backtest_task = asyncio.ensure_future(asyncio.to_thread(
+            run_backtest,
             prices, 
             optimization_result["weights"], 
             benchmark_data=benchmark_data, 
@@ -162,37 +209,98 @@ async def optimize(request: Request, portfolio_request: PortfolioRequest):
             risk_free_rate=rf_rate,
             annualization_factor=annualization_factor,
             mar=portfolio_request.mar,
-            rebalance_freq=portfolio_request.rebalance_freq
-        )
-        
-        warnings = []
-        if not prices.empty:
-             actual_start = prices.index[0].strftime("%Y-%m-%d")
-             if actual_start > portfolio_request.start_date:
-                  warnings.append(f"Data limited: Optimization starts from {actual_start} (earliest common date).")
+            rebalance_freq=portfolio_request.rebalance_freq,
+            asset_returns=return_stats.returns
+        ))
+        pending[backtest_task] = "backtest"
         
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                section = pending.pop(task)
+                payload = task.result()
+                if section == "efficient_frontier":
+                    if portfolio_request.objective == "sharpe":
+                        logger.debug("Forcing Max Sharpe consistency with main optimization results")
+                        payload["optimal_portfolio"] = {
+                            "return": optimization_result["metrics"]["expected_return"],
+                            "volatility": optimization_result["metrics"]["volatility"],
+                            "sharpe_ratio": optimization_result["metrics"]["sharpe_ratio"],
+                            "weights": optimization_result["weights"]
+                        }
+                        payload["cml_points"] = capital_market_line(payload["optimal_portfolio"], rf_rate)
+                    else:
+                        logger.debug("Objective is %s, skipping Max Sharpe override", portfolio_request.objective)
+                response[section] = payload
+                yield section, payload
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    if not portfolio_request.compute_frontier:
+        yield "efficient_frontier", None
+    
+    warnings = []
+    actual_start = prices.index[0].strftime("%Y-%m-%d")
+    if actual_start > portfolio_request.start_date:
+        warnings.append(f"Data limited: Optimization starts from {actual_start} (earliest common date).")
+    
+    response["parameters"] = {
+        "risk_free_rate": rf_rate,
+        "tickers": portfolio_request.tickers,
+        "period": f"{portfolio_request.start_date} to {portfolio_request.end_date}"
+    }
+    response["warnings"] = warnings
+    yield "parameters", response["parameters"]
+    yield "warnings", warnings
+    _optimize_results.set(portfolio_request, {section: response[section] for section in _OPTIMIZE_SECTIONS})
 
+@app.post("/api/optimize")
+@limiter.limit(RATE_LIMITS["compute_intensive"])
+async def optimize(request: Request, portfolio_request: PortfolioRequest):
+    try:
+        _validate_portfolio_request(portfolio_request)
+        
+        sections = {}
+        async for section, payload in _optimize_stages(portfolio_request):
+            sections[section] = payload
+        return {section: sections[section] for section in _OPTIMIZE_SECTIONS}
 
-        return {
-            "optimization": optimization_result,
-            "backtest": backtest_result,
-            "efficient_frontier": efficient_frontier_data,
-            "parameters": {
-                "risk_free_rate": rf_rate,
-                "tickers": portfolio_request.tickers,
-                "period": f"{portfolio_request.start_date} to {portfolio_request.end_date}"
-            },
-            "warnings": warnings
-        }
-
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        print(f"Internal Server Error: {str(e)}")
+        logger.exception("Internal Server Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/optimize/stream")
+@limiter.limit(RATE_LIMITS["compute_intensive"])
+async def optimize_stream(request: Request, portfolio_request: PortfolioRequest):
+    """
+    /api/optimize as Server-Sent Events: one event per response section
+    (optimization, backtest, efficient_frontier, parameters, warnings) as
+    soon as it is ready, then "done". Failures after the stream has started
+    arrive as an "error" event carrying the detail.
+    """
+    _validate_portfolio_request(portfolio_request)
+    
+    async def events():
+        try:
+            async for section, payload in _optimize_stages(portfolio_request):
+                yield b"event: " + section.encode() + b"\ndata: " + _dumps(payload) + b"\n\n"
+            yield b"event: done\ndata: {}\n\n"
+        except Exception as e:
+            logger.exception("Optimization stream failed: %s", e)
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield b"event: error\ndata: " + _dumps({"detail": detail}) + b"\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/history")
 @limiter.limit(RATE_LIMITS["data_fetch"])
 def get_history(request: Request, ticker: str, period: str = "1mo", interval: str = "1d"):
@@ -208,22 +316,50 @@ def get_history(request: Request, ticker: str, period: str = "1mo", interval: st
             raise HTTPException(status_code=400, detail=f"Invalid interval. Must be one of: {', '.join(valid_intervals)}")
         
         from data import get_chart_data
-        data = get_chart_data(ticker, period, interval)
-        return data
+        return Response(content=get_chart_data(ticker, period, interval, as_json=True), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/stock_info")
 @limiter.limit(RATE_LIMITS["data_fetch"])
-def get_stock_info_endpoint(request: Request, ticker: str):
+def get_stock_info_endpoint(request: Request, ticker: str, fields: Optional[str] = None):
     try:
         InputValidator.validate_ticker(ticker)
         from data import get_stock_info
-        data = get_stock_info(ticker)
+        requested_fields = {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+        data = get_stock_info(ticker, fields=requested_fields)
         return data
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/stock_info/batch")
+@limiter.limit(RATE_LIMITS["data_fetch"])
+def get_stock_info_batch_endpoint(request: Request, tickers: str, fields: Optional[str] = None):
+    try:
+        ticker_list = [t.strip() for t in tickers.split(",") if t.strip()]
+        InputValidator.validate_tickers(ticker_list)
+        from data import get_stock_info_batch
+        requested_fields = {f.strip() for f in fields.split(",") if f.strip()} if fields else None
+        return get_stock_info_batch(ticker_list, fields=requested_fields)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/overview/batch")
+@limiter.limit(RATE_LIMITS["data_fetch"])
+def get_overview_batch_endpoint(request: Request, tickers: str):
+    try:
+        ticker_list = [t.strip() for t in tickers.split(",") if t.strip()]
+        InputValidator.validate_tickers(ticker_list)
+        from data import fetch_info_parallel
+        return fetch_info_parallel(ticker_list)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 class StressTestRequest(BaseModel):
     weights: dict
@@ -247,14 +383,18 @@ async def stress_test(request: Request, stress_request: StressTestRequest):
         
         InputValidator.validate_ticker(stress_request.benchmark)
         
-        print(f"Running stress test for portfolio with {len(stress_request.weights)} assets")
-        historical_results = StressTester.run_stress_test(stress_request.weights, stress_request.benchmark)
-        hypothetical_results = StressTester.run_hypothetical_test(stress_request.weights, stress_request.benchmark)
+        logger.debug("Running stress test for portfolio with %d assets", len(stress_request.weights))
+        # Both tests download through yfinance, which blocks; run them in
+        # worker threads so the event loop keeps serving other requests.
+        historical_results, hypothetical_results = await asyncio.gather(
+            asyncio.to_thread(StressTester.run_stress_test, stress_request.weights, stress_request.benchmark),
+            asyncio.to_thread(StressTester.run_hypothetical_test, stress_request.weights, stress_request.benchmark)
+        )
         
         results = historical_results + hypothetical_results
         return {"results": results}
     except Exception as e:
-        print(f"Stress test error: {e}")
+        logger.exception("Stress test error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analyst_ratings")
@@ -281,6 +421,19 @@ def get_quote_endpoint(request: Request, ticker: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/prices")
+@limiter.limit(RATE_LIMITS["data_fetch"])
+def get_prices_endpoint(request: Request, tickers: str):
+    try:
+        ticker_list = [t.strip() for t in tickers.split(",") if t.strip()]
+        InputValidator.validate_tickers(ticker_list)
+        from data import fetch_latest_prices
+        return fetch_latest_prices(ticker_list)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @app.get("/api/whatif")
 @limiter.limit(RATE_LIMITS["data_fetch"])
@@ -310,6 +463,28 @@ def whatif_endpoint(request: Request, ticker: str, date: str, amount: float):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/whatif/batch")
+@limiter.limit(RATE_LIMITS["data_fetch"])
+def whatif_batch_endpoint(request: Request, tickers: str, dates: str, amount: float):
+    """
+    What-if results for aligned comma-separated tickers and start dates.
+    """
+    try:
+        ticker_list = [t.strip() for t in tickers.split(",") if t.strip()]
+        date_list = [d.strip() for d in dates.split(",") if d.strip()]
+        InputValidator.validate_tickers(ticker_list)
+        if len(date_list) != len(ticker_list):
+            raise HTTPException(status_code=400, detail="tickers and dates must have the same length")
+        if amount <= 0 or amount > 1_000_000_000:
+            raise HTTPException(status_code=400, detail="Amount must be between 0 and 1 billion")
+        
+        from data import calculate_whatif_batch
+        return calculate_whatif_batch(ticker_list, date_list, amount)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,6 +1,61 @@
+import copy
+import math
+import hashlib
+import functools
+import inspect
+import logging
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
+from typing import NamedTuple, Optional
+from scipy.linalg import LinAlgError, cho_factor, cho_solve
+from scipy.optimize import OptimizeResult, minimize
+
+from cache import TTLStore, TTL_OPTIMIZE
+
+logger = logging.getLogger(__name__)
+
+def _frame_digest(frame) -> Optional[tuple]:
+    """Content key for a price frame or series: labels plus a hash of the values."""
+    if frame is None:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(frame.index.values).tobytes())
+    h.update(np.ascontiguousarray(frame.to_numpy()).tobytes())
+    columns = tuple(frame.columns) if isinstance(frame, pd.DataFrame) else frame.name
+    return columns, h.digest()
+
+def _memoize_on_prices(maxsize: int = 256):
+    """
+    Memoize an optimizer entry point on the content of its price frames plus
+    its scalar arguments, so a resubmitted request with the same data and
+    constraints is a dict hit. The precomputed stats argument is left out of
+    the key (it is derived from prices), results whose "success" is False are
+    not stored, and callers always get a deep copy, so nothing they do to the
+    result (or its nested points and weights) can reach the cached entry.
+    """
+    def decorator(fn):
+        store = TTLStore(ttl=TTL_OPTIMIZE, maxsize=maxsize)
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = tuple(
+                (name, _frame_digest(value) if isinstance(value, (pd.DataFrame, pd.Series)) else
+                       tuple(sorted(value.items())) if isinstance(value, dict) else value)
+                for name, value in bound.arguments.items() if name != "stats"
+            )
+            value = store.get(key)
+            if value is None:
+                value = fn(*args, **kwargs)
+                if value and value.get("success", True):
+                    store.set(key, value)
+            return copy.deepcopy(value)
+
+        wrapper.cache_clear = store.clear
+        return wrapper
+    return decorator
 
 def ledoit_wolf_shrinkage(returns: pd.DataFrame):
     """
@@ -19,68 +74,177 @@ def ledoit_wolf_shrinkage(returns: pd.DataFrame):
     - Recommended by CFA Institute for portfolios with >20 assets
     
     Args:
-        returns: DataFrame of asset returns (T x N, where T = time periods, N = assets)
+        returns: DataFrame or array of asset returns (T x N, where T = time periods, N = assets)
     
     Returns:
-        Shrunk covariance matrix (N x N)
+        Shrunk covariance matrix (N x N) and the shrinkage intensity
     """
-    T, N = returns.shape  
-    
-    sample_cov = returns.cov().values
+    X = np.asarray(returns, dtype=np.float64)
+    T, N = X.shape
+    X = X - X.mean(axis=0)
     
-    mean_var = np.trace(sample_cov) / N
+    sample_cov = X.T @ X / (T - 1)
     
-    sample_corr = returns.corr().values
-    mean_corr = (np.sum(sample_corr) - N) / (N * (N - 1))  
+    # The shrinkage intensity uses the 1/T moments of the paper.
+    S = X.T @ X / T
+    var = np.diag(S)
+    std_devs = np.sqrt(var)
+    corr = S / np.outer(std_devs, std_devs)
+    mean_corr = (np.sum(corr) - N) / (N * (N - 1))
     
-    std_devs = np.sqrt(np.diag(sample_cov))
     target = mean_corr * np.outer(std_devs, std_devs)
-    np.fill_diagonal(target, np.diag(sample_cov))  
+    np.fill_diagonal(target, var)
     
-    delta_num = 0
-    delta_den = 0
+    X2 = X ** 2
+    pi_mat = X2.T @ X2 / T - S ** 2
+    pi_hat = np.sum(pi_mat)
     
-    for t in range(T):
-        r_t = returns.iloc[t].values.reshape(-1, 1)
-        centered = r_t - returns.mean().values.reshape(-1, 1)
-        sample_cov_t = centered @ centered.T
-        
-        delta_num += np.sum((sample_cov_t - sample_cov) ** 2)
+    theta_mat = (X2 * X).T @ X / T - var[:, None] * S
+    np.fill_diagonal(theta_mat, 0.0)
+    rho_hat = np.trace(pi_mat) + mean_corr * np.sum(np.outer(1 / std_devs, std_devs) * theta_mat)
     
-    delta_num /= T
-    delta_den = np.sum((sample_cov - target) ** 2)
+    gamma_hat = np.sum((S - target) ** 2)
     
-    delta = min(1, max(0, delta_num / delta_den)) if delta_den > 0 else 0
+    delta = min(1, max(0, (pi_hat - rho_hat) / gamma_hat / T)) if gamma_hat > 0 else 0
     
+    target *= T / (T - 1)
     shrunk_cov = delta * target + (1 - delta) * sample_cov
     
     return shrunk_cov, delta
 
-def calculate_portfolio_performance(weights, mean_returns, cov_matrix, risk_free_rate=0.045, annualization_factor=252):
+class ReturnStats(NamedTuple):
+    returns: pd.DataFrame
+    mean_returns: pd.Series
+    cov_matrix: pd.DataFrame
+    shrinkage: Optional[float] = None
+
+def compute_return_stats(prices: pd.DataFrame, shrinkage: bool = True) -> ReturnStats:
     """
-    Calculate portfolio return, volatility, and Sharpe ratio.
+    Periodic returns, mean returns and covariance for a price frame, computed
+    once and shared by optimize_portfolio, calculate_efficient_frontier and
+    run_backtest. Applies Ledoit-Wolf shrinkage for 20+ assets unless
+    shrinkage is False.
+    
+    Prices are usually gap-free by now (see ffill_drop_leading), in which case
+    the returns, mean and covariance come straight from a float64 copy of the
+    price array with one GEMM; frames with gaps take the pandas path, which
+    drops incomplete rows.
     """
-    returns = np.sum(mean_returns * weights) * annualization_factor
-    std = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights))) * np.sqrt(annualization_factor)
+    p = prices.to_numpy(dtype=np.float64)
+    if np.isnan(p).any():
+        returns = prices.pct_change().dropna()
+        mean_returns = returns.mean()
+    else:
+        r = p[1:] / p[:-1] - 1.0
+        returns = pd.DataFrame(r, index=prices.index[1:], columns=prices.columns)
+        mean_returns = pd.Series(r.mean(axis=0), index=prices.columns)
+    
+    num_assets = len(mean_returns)
+    if shrinkage and num_assets >= 20:
+        cov_matrix, shrinkage_intensity = ledoit_wolf_shrinkage(returns.to_numpy(dtype=np.float64))
+        logger.debug("Applied Ledoit-Wolf covariance shrinkage (intensity: %.3f) for %d-asset portfolio",
+                     shrinkage_intensity, num_assets)
+        cov_matrix = pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
+        return ReturnStats(returns, mean_returns, cov_matrix, shrinkage_intensity)
+    r = returns.to_numpy(dtype=np.float64)
+    centered = r - mean_returns.to_numpy()
+    cov = centered.T @ centered / (len(r) - 1)
+    return ReturnStats(returns, mean_returns, pd.DataFrame(cov, index=returns.columns, columns=returns.columns))
+
+def annualized_inputs(stats: ReturnStats, annualization_factor: int = 252) -> tuple:
+    """
+    Annualized mean returns and covariance as plain contiguous float64 arrays,
+    built once per optimization so the objectives never touch pandas or
+    rescale by the annualization factor per call.
+    """
+    mu = stats.mean_returns.to_numpy(dtype=np.float64) * annualization_factor
+    sigma = np.ascontiguousarray(stats.cov_matrix.to_numpy(dtype=np.float64) * annualization_factor)
+    return mu, sigma
+
+def calculate_portfolio_performance(weights, mu, sigma, risk_free_rate=0.045):
+    """
+    Calculate portfolio return, volatility, and Sharpe ratio from annualized
+    mean returns and covariance (see annualized_inputs).
+    """
+    returns = mu @ weights
+    std = math.sqrt(max(weights @ sigma @ weights, 0.0))
     sharpe = (returns - risk_free_rate) / std
     return returns, std, sharpe
 
-def negative_sharpe(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor):
+def negative_sharpe(weights, mu, sigma, risk_free_rate, annualization_factor):
     """Objective function for Max Sharpe Ratio"""
-    r, s, sharpe = calculate_portfolio_performance(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor)
+    r, s, sharpe = calculate_portfolio_performance(weights, mu, sigma, risk_free_rate)
     return -sharpe
 
-def portfolio_volatility(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor):
+def negative_sharpe_grad(weights, mu, sigma, risk_free_rate, annualization_factor):
+    """Gradient of negative_sharpe: -(mu * vol - (ret - rf) * sigma @ w / vol) / vol^2."""
+    sw = sigma @ weights
+    vol = math.sqrt(max(weights @ sw, 0.0))
+    excess = mu @ weights - risk_free_rate
+    return -(mu * vol - excess * sw / vol) / (vol * vol)
+
+def portfolio_volatility(weights, mu, sigma, risk_free_rate, annualization_factor):
     """Objective function for Minimum Variance"""
-    r, s, sharpe = calculate_portfolio_performance(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor)
-    return s
+    return math.sqrt(max(weights @ sigma @ weights, 0.0))
+
+def portfolio_volatility_grad(weights, mu, sigma, risk_free_rate, annualization_factor):
+    """Gradient of portfolio_volatility: sigma @ w / vol."""
+    sw = sigma @ weights
+    return sw / math.sqrt(max(weights @ sw, 0.0))
 
-def negative_return(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix=None, mar=None):
+def negative_return(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix=None, mar=None):
     """Negative expected return for maximizing return."""
-    portfolio_return = np.sum(mean_returns * weights) * annualization_factor
-    return -portfolio_return
+    return -(mu @ weights)
 
-def kelly_criterion(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar=None):
+def negative_return_grad(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix=None, mar=None):
+    """Gradient of negative_return."""
+    return -mu
+
+def closed_form_weights(sigma, b, min_weight: float, max_weight: float):
+    """
+    Budget-constrained Lagrangian solution w = Σ⁻¹b / 1ᵀΣ⁻¹b, wrapped as an
+    OptimizeResult, or None when the weight bounds would bind (or Σ is not
+    positive definite) and SLSQP is needed. b = 1 gives the minimum-variance
+    portfolio, b = μ - rf the tangency (Max Sharpe) portfolio.
+    """
+    try:
+        u = cho_solve(cho_factor(sigma), b)
+    except (LinAlgError, ValueError):
+        return None
+    total = u.sum()
+    if not np.isfinite(total) or total <= 1e-12:
+        return None
+    w = u / total
+    if (w < min_weight - 1e-9).any() or (w > max_weight + 1e-9).any():
+        return None
+    return OptimizeResult(x=w, success=True, message="Closed-form solution (weight bounds inactive)")
+
+def two_fund_frontier_weights(mu, sigma, target_returns):
+    """
+    Minimum-variance weights for every target return at once, subject only to
+    the budget and target-return constraints (one row per target), or None
+    when Σ is not positive definite. By the two-fund theorem each row is
+    λΣ⁻¹1 + γΣ⁻¹μ, so after one Cholesky factorisation the whole sweep is
+    two outer products instead of one SLSQP solve per point.
+    """
+    try:
+        factor = cho_factor(sigma)
+    except (LinAlgError, ValueError):
+        return None
+    a = cho_solve(factor, np.ones_like(mu))
+    b = cho_solve(factor, mu)
+    A, B, C = a.sum(), b.sum(), mu @ b
+    D = A * C - B * B
+    if not np.isfinite(D) or D <= 1e-12:
+        return None
+    targets = np.asarray(target_returns, dtype=np.float64)
+    return np.outer((C - B * targets) / D, a) + np.outer((A * targets - B) / D, b)
+
+# Gradient of the budget constraint sum(w) - 1.
+def _sum_grad(weights):
+    return np.ones_like(weights)
+
+def kelly_criterion(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar=None):
     """
     Kelly Criterion: Maximize expected geometric growth rate (log returns).
     
@@ -108,7 +272,7 @@ def kelly_criterion(weights, mean_returns, cov_matrix, risk_free_rate, annualiza
     
     return -expected_log_return  
 
-def negative_sortino(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar):
+def negative_sortino(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar):
     """
     Sortino Ratio: Maximize (Return - MAR) / Downside Semi-Deviation.
     
@@ -150,7 +314,7 @@ def negative_sortino(weights, mean_returns, cov_matrix, risk_free_rate, annualiz
     sortino = (mean_return - mar) / downside_deviation
     return -sortino
 
-def negative_omega(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar):
+def negative_omega(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar):
     """
     Omega Ratio: Maximize probability-weighted gains vs losses.
     
@@ -178,7 +342,7 @@ def negative_omega(weights, mean_returns, cov_matrix, risk_free_rate, annualizat
     omega = upside_sum / downside_sum
     return -omega
 
-def negative_treynor(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, benchmark_returns, mar=None):
+def negative_treynor(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix, benchmark_returns, mar=None):
     """
     Treynor Ratio: Maximize (Return - Risk_Free_Rate) / Beta.
     
@@ -230,7 +394,7 @@ def negative_treynor(weights, mean_returns, cov_matrix, risk_free_rate, annualiz
     
     return -treynor
 
-def negative_calmar(weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar):
+def negative_calmar(weights, mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar):
     """
     Calmar Ratio: Maximize Annualized Return / Maximum Drawdown.
     
@@ -275,7 +439,8 @@ def negative_calmar(weights, mean_returns, cov_matrix, risk_free_rate, annualiza
     
     return -calmar
 
-def optimize_portfolio(prices: pd.DataFrame, objective: str = "sharpe", risk_free_rate: float = 0.045, min_weight: float = 0.0, max_weight: float = 1.0, annualization_factor: int = 252, mar: float = 0.0, benchmark_prices: pd.Series = None):
+@_memoize_on_prices()
+def optimize_portfolio(prices: pd.DataFrame, objective: str = "sharpe", risk_free_rate: float = 0.045, min_weight: float = 0.0, max_weight: float = 1.0, annualization_factor: int = 252, mar: float = 0.0, benchmark_prices: pd.Series = None, stats: ReturnStats = None):
     """
     Run portfolio optimization based on the selected objective using Scipy.
     
@@ -284,18 +449,13 @@ def optimize_portfolio(prices: pd.DataFrame, objective: str = "sharpe", risk_fre
     
     Args:
         benchmark_prices: Benchmark price series (required for Treynor optimization)
+        stats: Precomputed compute_return_stats(prices), to skip recomputing them
     """
-    returns = prices.pct_change().dropna()
-    mean_returns = returns.mean()
-    
-    num_assets = len(mean_returns)
-    if num_assets >= 20:
-        cov_matrix, shrinkage_intensity = ledoit_wolf_shrinkage(returns)
-        print(f"INFO: Applied Ledoit-Wolf covariance shrinkage (intensity: {shrinkage_intensity:.3f}) for {num_assets}-asset portfolio")
-        print(f"      This improves estimation accuracy by reducing noise in the covariance matrix.")
-        cov_matrix = pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
-    else:
-        cov_matrix = returns.cov()
+    if stats is None:
+        stats = compute_return_stats(prices)
+    returns = stats.returns
+    mu, sigma = annualized_inputs(stats, annualization_factor)
+    num_assets = len(mu)
     
     returns_matrix = returns.values  
     tickers = prices.columns.tolist()
@@ -307,48 +467,63 @@ def optimize_portfolio(prices: pd.DataFrame, objective: str = "sharpe", risk_fre
         returns_matrix = returns.loc[common_index].values
         benchmark_returns = benchmark_returns_series.loc[common_index].values.flatten()
 
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
+    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': _sum_grad})
     
-    bounds = tuple((min_weight, max_weight) for _ in range(num_assets))
+    bounds = ((min_weight, max_weight),) * num_assets
     
-    initial_guess = num_assets * [1. / num_assets,]
+    initial_guess = np.full(num_assets, 1.0 / num_assets)
 
+    # Objectives with a closed-form gradient pass it as jac; the rest leave
+    # SLSQP to finite differences.
+    obj_jac = None
     if objective == "sharpe":
         obj_fun = negative_sharpe
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor)
+        obj_jac = negative_sharpe_grad
+        args = (mu, sigma, risk_free_rate, annualization_factor)
     elif objective == "min_vol" or objective == "min_volatility": 
         obj_fun = portfolio_volatility
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor)
+        obj_jac = portfolio_volatility_grad
+        args = (mu, sigma, risk_free_rate, annualization_factor)
     elif objective == "max_return":
         obj_fun = negative_return
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar)
+        obj_jac = negative_return_grad
+        args = (mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar)
     elif objective == "kelly":
         obj_fun = kelly_criterion
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar)
+        args = (mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar)
     elif objective == "sortino":
         obj_fun = negative_sortino
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar)
+        args = (mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar)
     elif objective == "omega":
         obj_fun = negative_omega
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar)
+        args = (mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar)
     elif objective == "calmar":
         obj_fun = negative_calmar
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, mar)
+        args = (mu, sigma, risk_free_rate, annualization_factor, returns_matrix, mar)
     elif objective == "treynor":
         if benchmark_returns is None:
             raise ValueError("Treynor optimization requires benchmark_prices parameter")
         obj_fun = negative_treynor
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor, returns_matrix, benchmark_returns, mar)
+        args = (mu, sigma, risk_free_rate, annualization_factor, returns_matrix, benchmark_returns, mar)
     else:
-        print(f"WARNING: Unknown objective '{objective}', defaulting to Sharpe Ratio")
+        logger.warning("Unknown objective '%s', defaulting to Sharpe Ratio", objective)
         obj_fun = negative_sharpe
-        args = (mean_returns, cov_matrix, risk_free_rate, annualization_factor)
+        obj_jac = negative_sharpe_grad
+        args = (mu, sigma, risk_free_rate, annualization_factor)
 
-    result = minimize(obj_fun, initial_guess, args=args, method='SLSQP', bounds=bounds, constraints=constraints)
+    # With no binding bounds, min-vol and Max Sharpe have exact one-shot
+    # solutions; only fall back to SLSQP when a bound is active.
+    result = None
+    if obj_fun is portfolio_volatility:
+        result = closed_form_weights(sigma, np.ones(num_assets), min_weight, max_weight)
+    elif obj_fun is negative_sharpe:
+        result = closed_form_weights(sigma, mu - risk_free_rate, min_weight, max_weight)
+    if result is None:
+        result = minimize(obj_fun, initial_guess, args=args, method='SLSQP', jac=obj_jac, bounds=bounds, constraints=constraints)
 
     optimal_weights = result.x
     
-    opt_return, opt_vol, opt_sharpe = calculate_portfolio_performance(optimal_weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor)
+    opt_return, opt_vol, opt_sharpe = calculate_portfolio_performance(optimal_weights, mu, sigma, risk_free_rate)
 
     return {
         "weights": {k: float(v) for k, v in zip(tickers, optimal_weights)},
@@ -361,7 +536,18 @@ def optimize_portfolio(prices: pd.DataFrame, objective: str = "sharpe", risk_fre
         "message": str(result.message)
     }
 
-def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = None, risk_free_rate: float = 0.045, min_weight: float = 0.0, max_weight: float = 1.0, annualization_factor: int = 252, num_portfolios: int = 100, benchmark_prices: pd.Series = None):
+def capital_market_line(optimal_portfolio: dict, risk_free_rate: float) -> list:
+    """Three points on the capital market line through the tangency portfolio."""
+    if not optimal_portfolio:
+        return []
+    return [
+        {"volatility": 0.0, "return": risk_free_rate, "sharpe_ratio": 0.0},
+        {"volatility": optimal_portfolio["volatility"], "return": optimal_portfolio["return"], "sharpe_ratio": optimal_portfolio["sharpe_ratio"]},
+        {"volatility": optimal_portfolio["volatility"] * 1.5, "return": risk_free_rate + optimal_portfolio["sharpe_ratio"] * (optimal_portfolio["volatility"] * 1.5), "sharpe_ratio": optimal_portfolio["sharpe_ratio"]}
+    ]
+
+@_memoize_on_prices()
+def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = None, risk_free_rate: float = 0.045, min_weight: float = 0.0, max_weight: float = 1.0, annualization_factor: int = 252, num_portfolios: int = 100, benchmark_prices: pd.Series = None, stats: ReturnStats = None):
     """
     Calculate the efficient frontier using industry-standard Markowitz optimization.
     
@@ -373,29 +559,24 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
     - GIPS Standards: Portfolio construction methodology
     - Ledoit-Wolf shrinkage for 20+ assets (BlackRock, Vanguard standard)
     """
-    returns = prices.pct_change().dropna()
-    mean_returns = returns.mean()
-    num_assets = len(mean_returns)
-    
-    if num_assets >= 20:
-        cov_matrix, shrinkage_intensity = ledoit_wolf_shrinkage(returns)
-        cov_matrix = pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
-        print(f"INFO: Applied Ledoit-Wolf shrinkage (δ={shrinkage_intensity:.3f}) per CFA guidelines for {num_assets} assets")
-    else:
-        cov_matrix = returns.cov()
+    if stats is None:
+        stats = compute_return_stats(prices)
+    returns, mean_returns = stats.returns, stats.mean_returns
+    mu, sigma = annualized_inputs(stats, annualization_factor)
+    num_assets = len(mu)
     
     tickers = prices.columns.tolist()
     
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-    bounds = tuple((min_weight, max_weight) for _ in range(num_assets))
-    initial_guess = num_assets * [1. / num_assets,]
+    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': _sum_grad})
+    bounds = ((min_weight, max_weight),) * num_assets
+    initial_guess = np.full(num_assets, 1.0 / num_assets)
     
-    print("\n=== CALCULATING GLOBAL MINIMUM VARIANCE PORTFOLIO ===")
-    gmvp_result = minimize(
+    gmvp_result = closed_form_weights(sigma, np.ones(num_assets), min_weight, max_weight) or minimize(
         portfolio_volatility,
         initial_guess,
-        args=(mean_returns, cov_matrix, risk_free_rate, annualization_factor),
+        args=(mu, sigma, risk_free_rate, annualization_factor),
         method='SLSQP',
+        jac=portfolio_volatility_grad,
         bounds=bounds,
         constraints=constraints,
         options={'maxiter': 1000, 'ftol': 1e-9}  
@@ -404,7 +585,7 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
     if gmvp_result.success:
         gmvp_weights = gmvp_result.x
         gmvp_ret, gmvp_vol, gmvp_sharpe = calculate_portfolio_performance(
-            gmvp_weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor
+            gmvp_weights, mu, sigma, risk_free_rate
         )
         
         min_variance_portfolio = {
@@ -414,30 +595,26 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
             "weights": {ticker: float(w) for ticker, w in zip(tickers, gmvp_weights)}
         }
         
-        print(f"✓ GMVP Successfully Calculated:")
-        print(f"  Volatility: {gmvp_vol:.4f}%")
-        print(f"  Return: {gmvp_ret:.4f}%")
-        print(f"  Sharpe: {gmvp_sharpe:.4f}")
+        logger.debug("GMVP: volatility %.4f, return %.4f, Sharpe %.4f", gmvp_vol, gmvp_ret, gmvp_sharpe)
         
         min_return = float(gmvp_ret)
     else:
-        print(f"✗ WARNING: GMVP optimization failed: {gmvp_result.message}")
+        logger.warning("GMVP optimization failed: %s", gmvp_result.message)
         min_variance_portfolio = None
-        min_return = float(np.sum(mean_returns * initial_guess) * annualization_factor)
+        min_return = float(mu @ initial_guess)
     
     max_ret_result = minimize(
-        lambda w: -np.sum(mean_returns * w) * annualization_factor,
+        lambda w: -(mu @ w),
         initial_guess,
         method='SLSQP',
+        jac=lambda w: -mu,
         bounds=bounds,
         constraints=constraints,
         options={'maxiter': 1000}
     )
-    max_return = float(np.sum(mean_returns * max_ret_result.x) * annualization_factor)
+    max_return = float(mu @ max_ret_result.x)
     
-    print(f"\n=== FRONTIER RANGE ===")
-    print(f"Min Return: {min_return:.4f}% (GMVP)")
-    print(f"Max Return: {max_return:.4f}%")
+    logger.debug("Frontier range: %.4f (GMVP) to %.4f", min_return, max_return)
     
     individual_assets = []
     for ticker in tickers:
@@ -461,7 +638,7 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
             "beta": asset_beta
         })
     
-    target_returns = np.linspace(min_return, max_return, 200)
+    target_returns = np.linspace(min_return, max_return, num_portfolios)
     
     if min_variance_portfolio:
         gmvp_return = min_variance_portfolio['return']
@@ -470,28 +647,43 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
             target_returns = np.insert(target_returns, idx, gmvp_return)
     
     frontier_points = []
-    print(f"\n=== GENERATING EFFICIENT FRONTIER ({len(target_returns)} points) ===")
     
+    # Where the unconstrained two-fund weights already respect the bounds they
+    # are the exact solution; SLSQP only runs on targets where a bound binds.
+    analytic = two_fund_frontier_weights(mu, sigma, target_returns)
+    within_bounds = np.zeros(len(target_returns), dtype=bool) if analytic is None else (
+        (analytic >= min_weight - 1e-9).all(axis=1) & (analytic <= max_weight + 1e-9).all(axis=1)
+    )
+    
+    # Targets ascend from the GMVP, and neighbouring problems differ only
+    # slightly, so each solve starts from the previous optimum.
+    x0 = gmvp_result.x if gmvp_result.success else initial_guess
     for i, target_ret in enumerate(target_returns):
-        constraints_with_return = (
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},
-            {'type': 'eq', 'fun': lambda x, tr=target_ret: np.sum(mean_returns * x) * annualization_factor - tr}
-        )
-        
-        result = minimize(
-            portfolio_volatility,
-            initial_guess,
-            args=(mean_returns, cov_matrix, risk_free_rate, annualization_factor),
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints_with_return,
-            options={'maxiter': 1000, 'ftol': 1e-9}
-        )
+        if within_bounds[i]:
+            weights = x0 = analytic[i]
+        else:
+            constraints_with_return = (
+                {'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': _sum_grad},
+                {'type': 'eq', 'fun': lambda x, tr=target_ret: mu @ x - tr, 'jac': lambda x: mu}
+            )
+            
+            result = minimize(
+                portfolio_volatility,
+                x0,
+                args=(mu, sigma, risk_free_rate, annualization_factor),
+                method='SLSQP',
+                jac=portfolio_volatility_grad,
+                bounds=bounds,
+                constraints=constraints_with_return,
+                options={'maxiter': 1000, 'ftol': 1e-9}
+            )
+            weights = None
+            if result.success:
+                weights = x0 = result.x
         
-        if result.success:
-            weights = result.x
+        if weights is not None:
             portfolio_return, portfolio_vol, portfolio_sharpe = calculate_portfolio_performance(
-                weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor
+                weights, mu, sigma, risk_free_rate
             )
             
             frontier_points.append({
@@ -500,16 +692,13 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
                 "sharpe_ratio": float(portfolio_sharpe),
                 "weights": {ticker: float(w) for ticker, w in zip(tickers, weights)}
             })
-        
-        if (i + 1) % 50 == 0:
-            print(f"  Progress: {i+1}/{len(target_returns)} points calculated")
     
-    print(f"✓ Frontier generation complete: {len(frontier_points)} points")
+    logger.debug("Frontier generation complete: %d of %d points", len(frontier_points), len(target_returns))
     
     if optimal_weights is not None:
         opt_weights_array = np.array([optimal_weights.get(t, 0.0) for t in tickers])
         opt_ret, opt_vol, opt_sharpe = calculate_portfolio_performance(
-            opt_weights_array, mean_returns, cov_matrix, risk_free_rate, annualization_factor
+            opt_weights_array, mu, sigma, risk_free_rate
         )
         optimal_portfolio = {
             "volatility": float(opt_vol),
@@ -517,26 +706,22 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
             "sharpe_ratio": float(opt_sharpe),
             "weights": optimal_weights
         }
-        print(f"\n=== OPTIMAL PORTFOLIO (Max Sharpe) ===")
-        print(f"  Volatility: {opt_vol:.4f}%")
-        print(f"  Return: {opt_ret:.4f}%")
-        print(f"  Sharpe: {opt_sharpe:.4f}")
+        logger.debug("Optimal portfolio: volatility %.4f, return %.4f, Sharpe %.4f", opt_vol, opt_ret, opt_sharpe)
     else:
         optimal_portfolio = max(frontier_points, key=lambda x: x['sharpe_ratio']) if frontier_points else None
     
     if min_variance_portfolio and optimal_portfolio:
         vol_diff = abs(min_variance_portfolio['volatility'] - optimal_portfolio['volatility'])
-        print(f"\n=== VALIDATION ===")
-        print(f"GMVP vs Optimal volatility difference: {vol_diff:.4f}%")
+        logger.debug("GMVP vs Optimal volatility difference: %.4f", vol_diff)
         if vol_diff < 0.01:
-            print("⚠ WARNING: GMVP and Optimal portfolios are nearly identical!")
+            logger.warning("GMVP and Optimal portfolios are nearly identical")
     
     num_simulations = 2000
     weights_sim = np.random.random((num_simulations, num_assets))
     weights_sim = weights_sim / np.sum(weights_sim, axis=1)[:, np.newaxis]
     
-    ret_sim = np.sum(weights_sim * mean_returns.values, axis=1) * annualization_factor
-    vol_sim = np.sqrt(np.sum((weights_sim @ cov_matrix.values) * weights_sim, axis=1) * annualization_factor)
+    ret_sim = weights_sim @ mu
+    vol_sim = np.sqrt(np.sum((weights_sim @ sigma) * weights_sim, axis=1))
     sharpe_sim = (ret_sim - risk_free_rate) / vol_sim
     
     monte_carlo_points = [
@@ -549,13 +734,7 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
         for i in range(num_simulations)
     ]
     
-    cml_points = []
-    if optimal_portfolio:
-        cml_points = [
-            {"volatility": 0.0, "return": risk_free_rate, "sharpe_ratio": 0.0},
-            {"volatility": optimal_portfolio["volatility"], "return": optimal_portfolio["return"], "sharpe_ratio": optimal_portfolio["sharpe_ratio"]},
-            {"volatility": optimal_portfolio["volatility"] * 1.5, "return": risk_free_rate + optimal_portfolio["sharpe_ratio"] * (optimal_portfolio["volatility"] * 1.5), "sharpe_ratio": optimal_portfolio["sharpe_ratio"]}
-        ]
+    cml_points = capital_market_line(optimal_portfolio, risk_free_rate)
     
     sml_points = []
     market_mean_return = None
@@ -570,8 +749,6 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
                 {"beta": 2.0, "return": risk_free_rate + 2.0 * (market_mean_return - risk_free_rate)}
             ]
     
-    print("\n=== EFFICIENT FRONTIER CALCULATION COMPLETE ===\n")
-    
     return {
         "frontier_points": frontier_points,
         "individual_assets": individual_assets,
@@ -583,329 +760,3 @@ def calculate_efficient_frontier(prices: pd.DataFrame, optimal_weights: dict = N
         "market_return": market_mean_return,
         "risk_free_rate": risk_free_rate  
     }
-    """
-    Calculate the efficient frontier by optimizing portfolios across a range of target returns.
-    
-    CRITICAL FIX: Calculates Global Minimum Variance Portfolio (GMVP) FIRST to ensure accuracy.
-    """
-    returns = prices.pct_change().dropna()
-    mean_returns = returns.mean()
-    num_assets = len(mean_returns)
-    
-    if num_assets >= 20:
-        cov_matrix, shrinkage_intensity = ledoit_wolf_shrinkage(returns)
-        cov_matrix = pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
-    else:
-        cov_matrix = returns.cov()
-    
-    tickers = prices.columns.tolist()
-    
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-    bounds = tuple((min_weight, max_weight) for _ in range(num_assets))
-    initial_guess = num_assets * [1. / num_assets,]
-    
-    print("INFO: Calculating Global Minimum Variance Portfolio (GMVP)...")
-    gmvp_result = minimize(
-        portfolio_volatility,
-        initial_guess,
-        args=(mean_returns, cov_matrix, risk_free_rate, annualization_factor),
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints,
-        options={'maxiter': 1000, 'ftol': 1e-9}
-    )
-    
-    if gmvp_result.success:
-        gmvp_weights = gmvp_result.x
-        gmvp_ret, gmvp_vol, gmvp_sharpe = calculate_portfolio_performance(
-            gmvp_weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor
-        )
-        min_variance_portfolio = {
-            "volatility": float(gmvp_vol),
-            "return": float(gmvp_ret),
-            "sharpe_ratio": float(gmvp_sharpe),
-            "weights": {ticker: float(w) for ticker, w in zip(tickers, gmvp_weights)}
-        }
-        print(f"INFO: GMVP found - Vol: {gmvp_vol:.2f}%, Return: {gmvp_ret:.2f}%, Sharpe: {gmvp_sharpe:.3f}")
-        min_return = float(gmvp_ret)
-    else:
-        print(f"WARNING: GMVP optimization failed: {gmvp_result.message}")
-        min_variance_portfolio = None
-        min_return = float(np.sum(mean_returns * initial_guess) * annualization_factor)
-    
-    max_ret_result = minimize(
-        lambda w: -np.sum(mean_returns * w) * annualization_factor,
-        initial_guess,
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints,
-        options={'maxiter': 1000}
-    )
-    max_return = float(np.sum(mean_returns * max_ret_result.x) * annualization_factor)
-    
-    """
-    Calculate the efficient frontier by optimizing portfolios across a range of target returns.
-    
-    For portfolios with 20+ assets, applies Ledoit-Wolf shrinkage for better covariance estimation.
-    
-    Args:
-        optimal_weights: Pre-calculated optimal portfolio weights from main optimization (ensures consistency)
-    
-    Returns:
-        - frontier_points: List of {volatility, return} points forming the efficient frontier
-        - individual_assets: List of {name, volatility, return} for each asset
-        - optimal_portfolio: The max Sharpe ratio portfolio coordinates (from provided optimal_weights)
-    """
-    returns = prices.pct_change().dropna()
-    mean_returns = returns.mean()
-    num_assets = len(mean_returns)
-    
-    if num_assets >= 20:
-        cov_matrix, shrinkage_intensity = ledoit_wolf_shrinkage(returns)
-        cov_matrix = pd.DataFrame(cov_matrix, index=returns.columns, columns=returns.columns)
-    else:
-        cov_matrix = returns.cov()
-    
-    tickers = prices.columns.tolist()
-    
-    market_mean_return = None
-    market_variance = None
-    aligned_benchmark = None
-    
-    if benchmark_prices is not None:
-        benchmark_returns = benchmark_prices.pct_change().dropna()
-        common_index = returns.index.intersection(benchmark_returns.index)
-        if len(common_index) > 10:
-            aligned_returns = returns.loc[common_index]
-            aligned_benchmark = benchmark_returns.loc[common_index]
-            
-            market_mean_return = float(aligned_benchmark.mean() * annualization_factor)
-            market_variance = float(aligned_benchmark.var() * annualization_factor)
-    
-    individual_assets = []
-    for ticker in tickers:
-        asset_return = float(mean_returns[ticker] * annualization_factor)
-        asset_vol = float(returns[ticker].std() * np.sqrt(annualization_factor))
-        
-        asset_beta = 0.0
-        if aligned_benchmark is not None:
-            covariance = aligned_returns[ticker].cov(aligned_benchmark)
-            market_var_raw = aligned_benchmark.var()
-            
-            if market_var_raw != 0:
-                asset_beta = float(covariance / market_var_raw)
-        
-        individual_assets.append({
-            "name": ticker,
-            "return": asset_return,
-            "volatility": asset_vol,
-            "beta": asset_beta
-        })
-    
-    constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-    bounds = tuple((min_weight, max_weight) for _ in range(num_assets))
-    initial_guess = num_assets * [1. / num_assets,]
-    
-    min_ret_result = minimize(
-        lambda w: np.sum(mean_returns * w) * annualization_factor,
-        initial_guess,
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints
-    )
-    
-    max_ret_result = minimize(
-        lambda w: -np.sum(mean_returns * w) * annualization_factor,
-        initial_guess,
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints
-    )
-    
-    
-    min_return = float(np.sum(mean_returns * min_ret_result.x) * annualization_factor)
-    max_return = float(np.sum(mean_returns * max_ret_result.x) * annualization_factor)
-
-    gmvp_result = minimize(
-        portfolio_volatility,
-        initial_guess,
-        args=(mean_returns, cov_matrix, risk_free_rate, annualization_factor),
-        method='SLSQP',
-        bounds=bounds,
-        constraints=constraints, 
-        options={'maxiter': 1000}
-    )
-    
-    if gmvp_result.success:
-        gmvp_weights = gmvp_result.x
-        gmvp_ret, gmvp_vol, gmvp_sharpe = calculate_portfolio_performance(
-            gmvp_weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor
-        )
-        min_variance_portfolio = {
-            "volatility": float(gmvp_vol),
-            "return": float(gmvp_ret),
-            "sharpe_ratio": float(gmvp_sharpe),
-            "weights": {ticker: float(w) for ticker, w in zip(tickers, gmvp_weights)}
-        }
-    else:
-        min_variance_portfolio = None
-
-    target_returns = np.linspace(min_return, max_return, 200) 
-    
-    if min_variance_portfolio:
-        idx = np.searchsorted(target_returns, min_variance_portfolio['return'])
-        target_returns = np.insert(target_returns, idx, min_variance_portfolio['return'])
-
-    frontier_points = []
-    
-    for target_ret in target_returns:
-        constraints_with_return = (
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},
-            {'type': 'eq', 'fun': lambda x, tr=target_ret: np.sum(mean_returns * x) * annualization_factor - tr}
-        )
-        
-        result = minimize(
-            portfolio_volatility,
-            initial_guess,
-            args=(mean_returns, cov_matrix, risk_free_rate, annualization_factor),
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints_with_return,
-            options={'maxiter': 1000}
-        )
-        
-        if result.success:
-            weights = result.x
-            
-            portfolio_return, portfolio_vol, portfolio_sharpe = calculate_portfolio_performance(
-                weights, mean_returns, cov_matrix, risk_free_rate, annualization_factor
-            )
-            
-            weights_dict = {ticker: float(w) for ticker, w in zip(tickers, weights)}
-            
-            frontier_points.append({
-                "volatility": float(portfolio_vol),
-                "return": float(portfolio_return),
-                "sharpe_ratio": float(portfolio_sharpe),
-                "weights": weights_dict
-            })
-    
-    if optimal_weights is not None:
-        opt_weights_array = np.array([optimal_weights.get(t, 0.0) for t in tickers])
-        opt_ret, opt_vol, opt_sharpe = calculate_portfolio_performance(
-            opt_weights_array, mean_returns, cov_matrix, risk_free_rate, annualization_factor
-        )
-        optimal_portfolio = {
-            "volatility": float(opt_vol),
-            "return": float(opt_ret),
-            "sharpe_ratio": float(opt_sharpe),
-            "weights": optimal_weights
-        }
-    elif frontier_points:
-        optimal_portfolio = max(frontier_points, key=lambda x: x['sharpe_ratio'])
-    else:
-        sharpe_result = minimize(
-            negative_sharpe,
-            initial_guess,
-            args=(mean_returns, cov_matrix, risk_free_rate, annualization_factor),
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints
-        )
-        
-        if sharpe_result.success:
-            opt_ret, opt_vol, opt_sharpe = calculate_portfolio_performance(
-                sharpe_result.x, mean_returns, cov_matrix, risk_free_rate, annualization_factor
-            )
-            optimal_portfolio = {
-                "volatility": float(opt_vol),
-                "return": float(opt_ret),
-                "sharpe_ratio": float(opt_sharpe),
-                "weights": {k: float(v) for k, v in zip(tickers, sharpe_result.x)}
-            }
-        else:
-            optimal_portfolio = None
-    
-    num_simulations = 2000
-    
-    # NOTE: min_variance_portfolio is already calculated explicitly above.
-    if min_variance_portfolio is None and frontier_points:
-         min_variance_portfolio = min(frontier_points, key=lambda x: x['volatility'])
-    
-    monte_carlo_points = []
-    
-    weights_sim = np.random.random((num_simulations, num_assets))
-    weights_sim = weights_sim / np.sum(weights_sim, axis=1)[:, np.newaxis]
-    
-    ret_sim = np.sum(weights_sim * mean_returns.values, axis=1) * annualization_factor
-    
-    vol_sim = np.sqrt(np.sum((weights_sim @ cov_matrix.values) * weights_sim, axis=1) * annualization_factor)
-    
-    sharpe_sim = (ret_sim - risk_free_rate) / vol_sim
-    
-    for i in range(num_simulations):
-        sim_weights = {ticker: float(weights_sim[i][j]) for j, ticker in enumerate(tickers)}
-        
-        monte_carlo_points.append({
-            "volatility": float(vol_sim[i]),
-            "return": float(ret_sim[i]),
-            "sharpe_ratio": float(sharpe_sim[i]),
-            "weights": sim_weights
-        })
-        
-    cml_points = []
-    if optimal_portfolio:
-        cml_points.append({
-            "volatility": 0.0,
-            "return": risk_free_rate,
-            "sharpe_ratio": 0.0
-        })
-        
-        cml_points.append({
-            "volatility": optimal_portfolio["volatility"],
-            "return": optimal_portfolio["return"],
-            "sharpe_ratio": optimal_portfolio["sharpe_ratio"]
-        })
-        
-        max_vol_cml = optimal_portfolio["volatility"] * 1.5
-        max_ret_cml = risk_free_rate + optimal_portfolio["sharpe_ratio"] * max_vol_cml
-        
-        cml_points.append({
-            "volatility": max_vol_cml,
-            "return": max_ret_cml,
-            "sharpe_ratio": optimal_portfolio["sharpe_ratio"]
-        })
-
-    sml_points = []
-    if market_mean_return is not None:
-        sml_points.append({
-            "beta": 0.0,
-            "return": risk_free_rate
-        })
-        
-        sml_points.append({
-            "beta": 1.0,
-            "return": market_mean_return
-        })
-        
-        beta_ext = 2.0
-        ret_ext = risk_free_rate + beta_ext * (market_mean_return - risk_free_rate)
-        
-        sml_points.append({
-            "beta": beta_ext,
-            "return": ret_ext
-        })
-
-    print(f"DEBUG: Optimal Portfolio: {optimal_portfolio}")
-    print(f"DEBUG: Min Variance Portfolio: {min_variance_portfolio}")
-
-    return {
-        "frontier_points": frontier_points,
-        "individual_assets": individual_assets,
-        "optimal_portfolio": optimal_portfolio,
-        "min_variance_portfolio": min_variance_portfolio,
-        "monte_carlo_points": monte_carlo_points,
-        "cml_points": cml_points,
-        "sml_points": sml_points,
-        "market_return": market_mean_return
-    }
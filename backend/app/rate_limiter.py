@@ -2,8 +2,14 @@
 Rate limiting configuration for API endpoints.
 Uses slowapi (token bucket algorithm) for rate limiting based on IP address.
 Compatible with Render.com and other proxy-based hosting.
+
+Also provides a token bucket for throttling our own outbound requests to
+Yahoo Finance.
 """
 
+import os
+import time
+import threading
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from fastapi import Request
@@ -48,3 +54,36 @@ RATE_LIMITS = {
     "compute_intensive": "10/minute",  
     "data_fetch": "30/minute",  
 }
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available,
+    refilling at `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Yahoo starts returning 429s well before it documents any limit; a few
+# requests per second with a small burst keeps a busy worker under it.
+yahoo_bucket = TokenBucket(
+    rate=float(os.environ.get("YAHOO_REQUESTS_PER_SECOND", 5)),
+    capacity=int(os.environ.get("YAHOO_REQUEST_BURST", 10))
+)
@@ -1,7 +1,11 @@
+import logging
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import yfinance as yf
+
+from data import ffill_drop_leading, yf_download
+
+logger = logging.getLogger(__name__)
 
 class StressTester:
     """
@@ -64,7 +68,7 @@ class StressTester:
                 start_dt = datetime.strptime(scenario["start_date"], "%Y-%m-%d")
                 buffer_start = (start_dt - pd.Timedelta(days=5)).strftime("%Y-%m-%d")
                 
-                data = yf.download(
+                data = yf_download(
                     tickers + [benchmark_ticker], 
                     start=buffer_start, 
                     end=scenario["end_date"], 
@@ -97,7 +101,7 @@ class StressTester:
                     })
                     continue
 
-                data = data.ffill().dropna()
+                data, _ = ffill_drop_leading(data)
                 
                 if data.empty:
                      results.append({
@@ -182,7 +186,7 @@ class StressTester:
                 })
 
             except Exception as e:
-                print(f"Error running stress test {key}: {e}")
+                logger.error("Error running stress test %s: %s", key, e)
                 results.append({
                     "id": key,
                     "name": scenario["name"],
@@ -214,7 +218,7 @@ class StressTester:
             factors = [benchmark_ticker, "TLT"]
             all_tickers = list(set(tickers + factors))
             
-            data = yf.download(all_tickers, start=start_date, end=end_date, progress=False)
+            data = yf_download(all_tickers, start=start_date, end=end_date, progress=False)
             
             if isinstance(data, pd.DataFrame):
                 if 'Adj Close' in data.columns:
@@ -230,7 +234,7 @@ class StressTester:
             if isinstance(data, pd.Series):
                 data = data.to_frame()
             
-            data = data.ffill().dropna()
+            data, _ = ffill_drop_leading(data)
             
             if data.empty:
                 return []
@@ -333,6 +337,6 @@ class StressTester:
                 })
                 
         except Exception as e:
-            print(f"Hypothetical stress test error: {e}")
+            logger.error("Hypothetical stress test error: %s", e)
             
         return results
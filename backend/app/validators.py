@@ -10,6 +10,7 @@ class InputValidator:
     MAX_TICKER_LENGTH = 10  
     MAX_LOOKBACK_YEARS = 20  
     MIN_DATE_RANGE_DAYS = 30  
+    MAX_FRONTIER_PORTFOLIOS = 500
     
     TICKER_PATTERN = re.compile(r'^[A-Z0-9.\-]{1,10}$', re.IGNORECASE)
     
@@ -181,3 +182,13 @@ class InputValidator:
             )
         
         return True
+    
+    @classmethod
+    def validate_num_portfolios(cls, num_portfolios: int) -> bool:
+        if num_portfolios < 2 or num_portfolios > cls.MAX_FRONTIER_PORTFOLIOS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Number of frontier portfolios must be between 2 and {cls.MAX_FRONTIER_PORTFOLIOS}"
+            )
+        
+        return True